@@ -0,0 +1,99 @@
+from PIL import Image
+import hashlib
+import os
+
+# the bird, feather and back PNGs are drawn for the scale 2 sheet
+ART_SCALE = 2
+
+# path -> entry dict holding the decoded art and what it was decoded from
+_art_cache = {}
+# (path, scale) -> (digest, image, mask) resampled for a sheet scale
+_scaled_cache = {}
+_art_stats = {"decodes": 0, "resamples": 0, "hits": 0}
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_art(path):
+    """RGBA image and its alpha mask for path, decoded once per process
+
+    An entry is reused while the file's mtime and size are unchanged. If
+    either moves the bytes are hashed, and the art is only decoded again
+    when the content really changed (a touch or a checkout doesn't count).
+    """
+    stat = os.stat(path)
+    entry = _art_cache.get(path)
+
+    if entry is not None:
+        if (stat.st_mtime_ns, stat.st_size) == entry["stamp"]:
+            _art_stats["hits"] += 1
+            return entry["image"], entry["mask"]
+        digest = file_digest(path)
+        if digest == entry["digest"]:
+            entry["stamp"] = (stat.st_mtime_ns, stat.st_size)
+            _art_stats["hits"] += 1
+            return entry["image"], entry["mask"]
+    else:
+        digest = file_digest(path)
+
+    with Image.open(path) as source:
+        image = source.convert("RGBA") if source.mode != "RGBA" else source.copy()
+    mask = image.getchannel("A")
+    _art_stats["decodes"] += 1
+
+    _art_cache[path] = {
+        "stamp": (stat.st_mtime_ns, stat.st_size),
+        "digest": digest,
+        "image": image,
+        "mask": mask,
+    }
+    return image, mask
+
+
+def load_scaled_art(path, scale):
+    """load_art resampled for a sheet at scale, once per scale and content
+
+    Enlarging uses nearest neighbour so pixel art stays crisp, shrinking
+    averages with a box filter.
+    """
+    image, mask = load_art(path)
+    if scale == ART_SCALE:
+        return image, mask
+
+    digest = _art_cache[path]["digest"]
+    entry = _scaled_cache.get((path, scale))
+    if entry is not None and entry[0] == digest:
+        _art_stats["hits"] += 1
+        return entry[1], entry[2]
+
+    size = (image.width * scale // ART_SCALE, image.height * scale // ART_SCALE)
+    resample = Image.Resampling.NEAREST if scale > ART_SCALE else Image.Resampling.BOX
+    scaled = image.resize(size, resample)
+    scaled_mask = scaled.getchannel("A")
+    _art_stats["resamples"] += 1
+    _scaled_cache[(path, scale)] = (digest, scaled, scaled_mask)
+    return scaled, scaled_mask
+
+
+def art_digest(path):
+    """content hash of path as last loaded, loading it if needed"""
+    load_art(path)
+    return _art_cache[path]["digest"]
+
+
+def clear_art_cache():
+    _art_cache.clear()
+    _scaled_cache.clear()
+
+
+def art_load_stats():
+    return dict(_art_stats)
+
+
+def report_art_loads():
+    stats = art_load_stats()
+    print(f'Art: {stats["decodes"]} PNG decodes, {stats["resamples"]} resamples, '
+          f'{stats["hits"]} cache hits')
@@ -0,0 +1,226 @@
+from PIL import Image
+import argparse
+import hashlib
+import os
+import sys
+
+from deck_maker import card_geometry, frame_origin
+from sheet_io import atomic_save, atomic_write_json
+
+
+def split_sheet(sheet, card_width, card_height, card_spacing, frame_count, cards_across=3):
+    """frames of a spaced spritesheet, in frame index order"""
+    frames = []
+    for position in range(frame_count):
+        x, y = frame_origin(position, card_width, card_height, card_spacing, cards_across)
+        frames.append(sheet.crop((x, y, x + card_width, y + card_height)))
+    return frames
+
+
+def trim_frame(frame):
+    """frame cropped to its non-transparent pixels, and the crop box
+
+    A fully transparent frame keeps a single pixel so it still packs.
+    """
+    box = frame.getchannel("A").getbbox() or (0, 0, 1, 1)
+    return frame.crop(box), box
+
+
+def extrude(img, amount):
+    """img with its edge pixels repeated outward by amount, against bleeding"""
+    if amount <= 0:
+        return img
+    w, h = img.size
+    out = Image.new(img.mode, (w + 2 * amount, h + 2 * amount))
+    out.paste(img, (amount, amount))
+    left, right = img.crop((0, 0, 1, h)), img.crop((w - 1, 0, w, h))
+    for i in range(amount):
+        out.paste(left, (i, amount))
+        out.paste(right, (amount + w + i, amount))
+    top = out.crop((0, amount, w + 2 * amount, amount + 1))
+    bottom = out.crop((0, amount + h - 1, w + 2 * amount, amount + h))
+    for i in range(amount):
+        out.paste(top, (0, i))
+        out.paste(bottom, (0, amount + h + i))
+    return out
+
+
+def _maxrects_pack(sizes, bin_width, bin_height):
+    """MaxRects, best-short-side-fit; positions in input order or None if it won't fit"""
+    free = [(0, 0, bin_width, bin_height)]
+    positions = [None] * len(sizes)
+
+    # place big rectangles first, they are the hardest to fit late
+    order = sorted(range(len(sizes)), key=lambda i: (-max(sizes[i]), -min(sizes[i])))
+    for index in order:
+        w, h = sizes[index]
+        best = None
+        for fx, fy, fw, fh in free:
+            if w <= fw and h <= fh:
+                short_side = min(fw - w, fh - h)
+                long_side = max(fw - w, fh - h)
+                score = (short_side, long_side, fy, fx)
+                if best is None or score < best[0]:
+                    best = (score, fx, fy)
+        if best is None:
+            return None
+        _, x, y = best
+        positions[index] = (x, y)
+
+        # split every free rectangle the placed one overlaps
+        placed = (x, y, x + w, y + h)
+        next_free = []
+        for fx, fy, fw, fh in free:
+            fx2, fy2 = fx + fw, fy + fh
+            if placed[0] >= fx2 or placed[2] <= fx or placed[1] >= fy2 or placed[3] <= fy:
+                next_free.append((fx, fy, fw, fh))
+                continue
+            if placed[0] > fx:
+                next_free.append((fx, fy, placed[0] - fx, fh))
+            if placed[2] < fx2:
+                next_free.append((placed[2], fy, fx2 - placed[2], fh))
+            if placed[1] > fy:
+                next_free.append((fx, fy, fw, placed[1] - fy))
+            if placed[3] < fy2:
+                next_free.append((fx, placed[3], fw, fy2 - placed[3]))
+
+        # drop free rectangles wholly inside another
+        free = [a for i, a in enumerate(next_free)
+                if not any(j != i and b[0] <= a[0] and b[1] <= a[1]
+                           and b[0] + b[2] >= a[0] + a[2] and b[1] + b[3] >= a[1] + a[3]
+                           and (b != a or j < i)
+                           for j, b in enumerate(next_free))]
+    return positions
+
+
+def pack_rectangles(sizes, power_of_two=False, max_size=4096):
+    """(width, height, positions) of the smallest packing found
+
+    Candidate bin widths are tried from the widest rectangle up; among
+    equal areas the squarer result wins. Neither side may exceed max_size,
+    the usual WebGL texture limit.
+    """
+    widest = max(w for w, _ in sizes)
+    tallest = max(h for _, h in sizes)
+    tallest_stack = sum(h for _, h in sizes)
+
+    if power_of_two:
+        widths = [1 << n for n in range(max(widest - 1, 0).bit_length(), 16)]
+    else:
+        widths = sorted({widest * n for n in range(1, len(sizes) + 1)} |
+                        {w for w in range(widest, widest * len(sizes) + 1, max(1, widest // 8))})
+
+    best = None
+    for width in widths:
+        if width > max_size or (best is not None and width * tallest >= best[0][0]):
+            break
+        positions = _maxrects_pack(sizes, width, tallest_stack)
+        if positions is None:
+            continue
+        used_width = max(x + w for (x, _), (w, _) in zip(positions, sizes))
+        used_height = max(y + h for (_, y), (_, h) in zip(positions, sizes))
+        if power_of_two:
+            used_width = width
+            used_height = 1 << max(used_height - 1, 0).bit_length()
+        if used_height > max_size:
+            continue
+        score = (used_width * used_height, max(used_width, used_height))
+        if best is None or score < best[0]:
+            best = (score, used_width, used_height, positions)
+
+    if best is None:
+        raise ValueError(f"frames do not fit in a {max_size}x{max_size} atlas")
+    _, width, height, positions = best
+    return width, height, positions
+
+
+def pack_atlas(frames, image_name, extrusion=1, padding=0, power_of_two=False, max_size=4096,
+               first_frame=0):
+    """pack frames into one atlas image plus Phaser JSON-hash frame data
+
+    Identical frames are stored once, transparent borders are trimmed and
+    each packed frame is extruded by extrusion pixels. Frames keep their
+    sheet index as their name, so the game's frame numbers don't change;
+    first_frame is the sheet index of frames[0] when packing part of a sheet.
+    """
+    unique = {}
+    frame_refs = []
+    for frame in frames:
+        digest = hashlib.sha1(frame.tobytes() + repr(frame.size).encode()).hexdigest()
+        if digest not in unique:
+            trimmed, box = trim_frame(frame)
+            unique[digest] = (extrude(trimmed, extrusion), box, frame.size)
+        frame_refs.append(digest)
+
+    digests = list(unique)
+    sizes = [(unique[d][0].width + padding, unique[d][0].height + padding) for d in digests]
+    width, height, positions = pack_rectangles(sizes, power_of_two, max_size)
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    placed = {}
+    for digest, (x, y) in zip(digests, positions):
+        tile, box, source_size = unique[digest]
+        atlas.paste(tile, (x, y))
+        placed[digest] = (x + extrusion, y + extrusion, box, source_size)
+
+    data = {"frames": {}, "meta": {
+        "app": "talon atlas_packer",
+        "version": "1.0",
+        "image": image_name,
+        "format": "RGBA8888",
+        "size": {"w": width, "h": height},
+        "scale": "1",
+    }}
+    for index, digest in enumerate(frame_refs):
+        x, y, (left, top, right, bottom), (source_w, source_h) = placed[digest]
+        w, h = right - left, bottom - top
+        data["frames"][str(first_frame + index)] = {
+            "frame": {"x": x, "y": y, "w": w, "h": h},
+            "rotated": False,
+            "trimmed": (w, h) != (source_w, source_h),
+            "spriteSourceSize": {"x": left, "y": top, "w": w, "h": h},
+            "sourceSize": {"w": source_w, "h": source_h},
+        }
+    return atlas, data
+
+
+def report_atlas(frames, atlas, data):
+    unique = len({(f["frame"]["x"], f["frame"]["y"]) for f in data["frames"].values()})
+    before = sum(f.width * f.height for f in frames)
+    print(f"Atlas: {len(frames)} frames, {unique} unique, "
+          f"{atlas.width}x{atlas.height}px ({atlas.width * atlas.height * 100 // before}% of frame area)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack a card spritesheet into a trimmed Phaser atlas')
+    parser.add_argument('sheet', help='spritesheet PNG, 3 cards across with spacing')
+    parser.add_argument('--scale', type=int, default=2, help='scale the sheet was rendered at')
+    parser.add_argument('--frames', type=int, default=57, help='number of frames in the sheet')
+    parser.add_argument('--extrude', type=int, default=1, help='edge pixels repeated around each frame')
+    parser.add_argument('--padding', type=int, default=0, help='empty pixels between frames')
+    parser.add_argument('--pot', action='store_true', help='power-of-two atlas size')
+    parser.add_argument('--max-size', type=int, default=4096, help='largest allowed atlas side')
+    parser.add_argument('--output', help='atlas PNG path (default: <sheet>_atlas.png)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.sheet):
+        print(f'Error: sheet not found: {args.sheet}')
+        sys.exit(1)
+
+    output_path = args.output or os.path.splitext(args.sheet)[0] + "_atlas.png"
+    json_path = os.path.splitext(output_path)[0] + ".json"
+
+    with Image.open(args.sheet) as source:
+        sheet = source.convert("RGBA")
+    frames = split_sheet(sheet, *card_geometry(args.scale), args.frames)
+    atlas, data = pack_atlas(frames, os.path.basename(output_path), args.extrude, args.padding,
+                             args.pot, args.max_size)
+
+    atomic_save(atlas, output_path)
+    atomic_write_json(data, json_path)
+    report_atlas(frames, atlas, data)
+    print(f"Saved atlas to: {output_path} and {json_path}")
+
+
+if __name__ == "__main__":
+    main()
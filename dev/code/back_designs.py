@@ -0,0 +1,102 @@
+from PIL import Image
+import argparse
+import os
+import sys
+import time
+
+from deck_maker import (FEATHER_PATH, FEATHER_FRAME, FEATHER_LATTICE, card_geometry,
+                        frame_origin, load_blank, add_variant_arguments, check_variant_arguments)
+from art_cache import load_scaled_art
+from back_tiling import Lattice, paste_pattern
+from sheet_io import atomic_save
+
+# name -> (tile art, lattice); feathers is the back shipped in frame 56
+BACK_DESIGNS = {
+    "feathers": (FEATHER_PATH, FEATHER_LATTICE),
+    "feathers-straight": (FEATHER_PATH, Lattice(6, 9, mirror_x=True)),
+    "feathers-quartered": (FEATHER_PATH, FEATHER_LATTICE._replace(mirror_y=True)),
+    "feathers-sideways": (FEATHER_PATH, FEATHER_LATTICE._replace(
+        transpose=Image.Transpose.ROTATE_90)),
+    "feathers-chequer": (FEATHER_PATH, Lattice(6, 9, mirror_x=True,
+                                               skip=lambda col, row: (col + row) % 2)),
+    "feathers-frame": (FEATHER_PATH, Lattice(6, 9, mirror_x=True, mirror_y=True,
+                                             skip=lambda col, row: 0 < col < 5 and 0 < row < 8)),
+}
+BACKS_DIR = "dev/art/backs"
+
+
+def render_back(name, side, top, base, scale):
+    """one card with the named design tiled over its blank"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+    xt, yt = frame_origin(FEATHER_FRAME, card_width, card_height, card_spacing)
+    card = load_blank(side, top, base, scale).crop((xt, yt, xt + card_width, yt + card_height))
+    path, lattice = BACK_DESIGNS[name]
+    tile, _ = load_scaled_art(path, scale)
+    paste_pattern(card, tile, lattice, (card_width // 2, card_height // 2))
+    return card
+
+
+def render_backs(names, side, top, base, scale):
+    """(name, card, seconds) for each design"""
+    backs = []
+    for name in names:
+        start = time.perf_counter()
+        card = render_back(name, side, top, base, scale)
+        backs.append((name, card, time.perf_counter() - start))
+    return backs
+
+
+def preview_strip(cards, spacing):
+    """the cards side by side, spaced like the deck sheet"""
+    width = sum(card.width + spacing for card in cards) + spacing
+    height = max(card.height for card in cards) + 2 * spacing
+    strip = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    x = spacing
+    for card in cards:
+        strip.paste(card, (x, spacing))
+        x += card.width + spacing
+    return strip
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render tiled card back designs in one run')
+    add_variant_arguments(parser)
+    parser.add_argument('--designs', default='all',
+                        help=f"comma separated, from {', '.join(BACK_DESIGNS)} (default: all)")
+    parser.add_argument('--each', action='store_true', help='also save every design on its own')
+    args = parser.parse_args()
+
+    check_variant_arguments(args)
+    names = list(BACK_DESIGNS) if args.designs == 'all' else \
+        [name.strip() for name in args.designs.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BACK_DESIGNS]
+    if unknown or not names:
+        print(f"Error: unknown designs {', '.join(unknown) or '(none given)'}; "
+              f"choose from {', '.join(BACK_DESIGNS)}")
+        sys.exit(1)
+
+    try:
+        # the blank and art are loaded before timing, so the times are the tiling alone
+        load_blank(args.side, args.top, args.base, args.scale)
+        for path, _ in BACK_DESIGNS.values():
+            load_scaled_art(path, args.scale)
+        backs = render_backs(names, args.side, args.top, args.base, args.scale)
+    except FileNotFoundError as e:
+        print(f'Error: required image file not found: {e}')
+        sys.exit(1)
+
+    suffix = f"side-{args.side}-top-{args.top}-base-{args.base}_scale-{args.scale}"
+    for name, card, seconds in backs:
+        print(f"  {name:<20} {seconds * 1000:>7.2f} ms")
+        if args.each:
+            atomic_save(card, os.path.join(BACKS_DIR, f"back-{name}_{suffix}.png"))
+    print(f"{len(backs)} designs in {sum(s for _, _, s in backs) * 1000:.1f} ms")
+
+    strip_path = os.path.join(BACKS_DIR, f"back-designs_{suffix}.png")
+    atomic_save(preview_strip([card for _, card, _ in backs], card_geometry(args.scale)[2]),
+                strip_path)
+    print(f"Preview saved to: {strip_path}")
+
+
+if __name__ == "__main__":
+    main()
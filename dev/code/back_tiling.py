@@ -0,0 +1,85 @@
+from PIL import Image
+from collections import namedtuple
+
+# a grid of tiles, across by down cells of one (transformed) tile each.
+# offset_columns are shifted down by offset times the tile height, and
+# skip(col, row) drops cells. mirror_x flips the right half of the
+# columns, mirror_y the lower half of the rows; transpose (an
+# Image.Transpose, or None) is applied to every tile before that.
+Lattice = namedtuple("Lattice", "across down offset_columns offset skip mirror_x mirror_y transpose",
+                     defaults=((), 0.5, None, False, False, None))
+
+
+# transposes that turn a tile on its side
+_SIDEWAYS = (Image.Transpose.ROTATE_90, Image.Transpose.ROTATE_270,
+             Image.Transpose.TRANSPOSE, Image.Transpose.TRANSVERSE)
+
+
+def cell_size(tile, lattice):
+    width, height = tile.size
+    return (height, width) if lattice.transpose in _SIDEWAYS else (width, height)
+
+
+def tile_variants(tile, lattice):
+    """(flip_x, flip_y) -> transformed tile, each computed once"""
+    base = tile.transpose(lattice.transpose) if lattice.transpose is not None else tile
+    variants = {(False, False): base}
+    for flip_x in (False, lattice.mirror_x):
+        for flip_y in (False, lattice.mirror_y):
+            if (flip_x, flip_y) in variants:
+                continue
+            variant = base
+            if flip_x:
+                variant = variant.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+            if flip_y:
+                variant = variant.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+            variants[(flip_x, flip_y)] = variant
+    return variants
+
+
+def lattice_cells(lattice, tile_width, tile_height):
+    """(x, y, flip_x, flip_y) for every cell the lattice keeps, from its top-left"""
+    shift = int(tile_height * lattice.offset)
+    cells = []
+    for row in range(lattice.down):
+        for col in range(lattice.across):
+            if lattice.skip is not None and lattice.skip(col, row):
+                continue
+            x = col * tile_width
+            y = row * tile_height + (shift if col in lattice.offset_columns else 0)
+            flip_x = lattice.mirror_x and col >= lattice.across - lattice.across // 2
+            flip_y = lattice.mirror_y and row >= lattice.down - lattice.down // 2
+            cells.append((x, y, flip_x, flip_y))
+    return cells
+
+
+def compose_layer(tile, lattice):
+    """the whole pattern on one transparent RGBA layer
+
+    Cells don't overlap, so each tile is copied in without blending and the
+    layer holds exactly the pixels the tiles would have been pasted with.
+    """
+    variants = tile_variants(tile.convert("RGBA") if tile.mode != "RGBA" else tile, lattice)
+    tile_width, tile_height = cell_size(tile, lattice)
+    cells = lattice_cells(lattice, tile_width, tile_height)
+    width = max(x for x, _, _, _ in cells) + tile_width
+    height = max(y for _, y, _, _ in cells) + tile_height
+
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for x, y, flip_x, flip_y in cells:
+        layer.paste(variants[(flip_x, flip_y)], (x, y))
+    return layer
+
+
+def paste_pattern(img, tile, lattice, centre):
+    """compose the lattice and paste it, centred on centre, in one masked paste
+
+    Centring uses the plain across by down grid, so offset columns hang
+    below it as they would with tiles pasted one by one.
+    """
+    layer = compose_layer(tile, lattice)
+    tile_width, tile_height = cell_size(tile, lattice)
+    start_x = centre[0] - lattice.across * tile_width // 2
+    start_y = centre[1] - lattice.down * tile_height // 2
+    img.paste(layer, (start_x, start_y), layer)
+    return layer
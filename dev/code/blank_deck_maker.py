@@ -1,134 +1,187 @@
 from PIL import Image, ImageDraw
+import numpy as np
+import argparse
 import os
 
 
-def create_blank_cards_template():
-    """make deck of blank playing cards at 56 by 78 pixels per card"""
-    scale = 2
+def draw_card_border(draw, x, y, card_width, card_height, corner_radius,
+                     side_width, top_width, base_width, border_colour):
+    """semi-transparent edge lines and corner arcs; a width of 0 skips that edge"""
+    if top_width:
+        # top-left corner arc
+        draw.arc(
+            [x, y, x + corner_radius * 2, y + corner_radius * 2],
+            180, 270,
+            fill=border_colour,
+            width=top_width
+        )
+        
+        # straight line across top (between corners)
+        draw.line(
+            [(x + corner_radius, y), (x + card_width - corner_radius - 1, y)],
+            fill=border_colour,
+            width=top_width
+        )
+        
+        # top-right corner arc
+        draw.arc(
+            [x + card_width - corner_radius * 2 - 1, y, 
+            x + card_width - 1, y + corner_radius * 2],
+            270, 0,
+            fill=border_colour,
+            width=top_width
+        )
+
+    if side_width:
+        # left side border line
+        draw.line(
+            [(x, y + corner_radius), (x, y + card_height - corner_radius - 1)],
+            fill=border_colour,
+            width=side_width
+        )
+
+        # right side border line
+        draw.line(
+            [(x + card_width - 1, y + corner_radius),
+             (x + card_width - 1, y + card_height - corner_radius - 1)],
+            fill=border_colour,
+            width=side_width
+        )
+
+    if base_width:
+        # bottom-left corner arc
+        draw.arc(
+            [x, y + card_height - corner_radius * 2 - 1,
+             x + corner_radius * 2, y + card_height - 1],
+            90, 180,
+            fill=border_colour,
+            width=base_width
+        )
+
+        # straight line across bottom (between corners)
+        draw.line(
+            [(x + corner_radius, y + card_height - 1),
+             (x + card_width - corner_radius - 1, y + card_height - 1)],
+            fill=border_colour,
+            width=base_width
+        )
+
+        # bottom-right corner arc
+        draw.arc(
+            [x + card_width - corner_radius * 2 - 1, y + card_height - corner_radius * 2 - 1,
+             x + card_width - 1, y + card_height - 1],
+            0, 90,
+            fill=border_colour,
+            width=base_width
+        )
+
+
+def render_blank_cards(side=1, top=1, base=1, scale=2, corner_radius=7,
+                       cards_across=3, cards_down=19):
+    """sheet of blank playing cards at 56 by 78 pixels per card, times scale
+
+    side, top and base are border styles 0-3: the width of that edge's
+    line in unscaled pixels, 0 for no line. corner_radius is unscaled too.
+    One blank is rasterized and then tiled across the grid with NumPy.
+    """
+    for name, style in (('side', side), ('top', top), ('base', base)):
+        if not 0 <= style <= 3:
+            raise ValueError(f'{name} must be 0-3, got {style}')
+    # up to 8 shipped, x4 more when a deck is supersampled
+    if not 1 <= scale <= 32:
+        raise ValueError(f'scale must be 1-32, got {scale}')
+    if cards_across < 1 or cards_down < 1:
+        raise ValueError(f'grid must be at least 1x1, got {cards_across}x{cards_down}')
+
     card_width = 56 * scale
     card_height = 78 * scale
-    cards_across = 3
-    cards_down = 19
-    border_size = 0
     card_spacing = 1 * scale  # spacing between card frames
-    
+
     # calculate total image size
     total_width = cards_across * card_width + (cards_across + 1) * card_spacing
     total_height = cards_down * card_height + (cards_down + 1) * card_spacing
-    
-    print(f"Making blank cards template: {total_width}x{total_height}px")
-    print(f"Card size: {card_width}x{card_height}px")
-    
-    # make image with transparency
-    img = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))  # transparent background
-    draw = ImageDraw.Draw(img)
-    
+
     # card settings
     fill_colour = (255, 250, 240, 255)  # cream white
-    corner_radius = 7 * scale # rounded corners
+    radius = corner_radius * scale # rounded corners
 
     ## border essential when cards are stacked or otherwise overlap.
     outline_colour = (0, 0, 0, 255)  # black
-    stroke_width = border_size
-    
-    # draw each card
-    for row in range(cards_down):
-        for col in range(cards_across):
-          # calculate card position
-          x = card_spacing + col * (card_width + card_spacing)
-          y = card_spacing + row * (card_height + card_spacing)
-            
-          # draw rounded rectangle for card - outline and fill
-          draw_rounded_rectangle(
-                          draw, 
-                          x, y, 
-                          x + card_width - 1,   #1*scale, 
-                          y + card_height - 1,   #1*scale,
-                          corner_radius,
-                          fill_colour,
-                          outline_colour,
-                          stroke_width
-                      )
-          
-    # after drawing all cards, add top borders
-    for row in range(cards_down):
-        for col in range(cards_across):
-            # calculate card position
-            x = card_spacing + col * (card_width + card_spacing)
-            y = card_spacing + row * (card_height + card_spacing)
-            
-            border_size = 2
-            border_colour = (0, 0, 0, 100)  # black
-            
-            # top-left corner arc
-            draw.arc(
-                [x, y, x + corner_radius * 2, y + corner_radius * 2],
-                180, 270,
-                fill=border_colour,
-                width=border_size
-            )
-            
-            # straight line across top (between corners)
-            draw.line(
-                [(x + corner_radius, y), (x + card_width - corner_radius - 1, y)],
-                fill=border_colour,
-                width=border_size
-            )
-            
-            # top-right corner arc
-            draw.arc(
-                [x + card_width - corner_radius * 2 - 1, y, 
-                x + card_width - 1, y + corner_radius * 2],
-                270, 0,
-                fill=border_colour,
-                width=border_size
-            )
-
-            # left side border line
-            draw.line(
-                [(x, y + corner_radius), (x, y + card_height - corner_radius - 1)],
-                fill=border_colour,
-                width=border_size
-            )
-
-            # right side border line
-            draw.line(
-                [(x + card_width - 1, y + corner_radius),
-                 (x + card_width - 1, y + card_height - corner_radius - 1)],
-                fill=border_colour,
-                width=border_size
-            )
-
-            # bottom-left corner arc
-            draw.arc(
-                [x, y + card_height - corner_radius * 2 - 1,
-                 x + corner_radius * 2, y + card_height - 1],
-                90, 180,
-                fill=border_colour,
-                width=border_size
-            )
-
-            # straight line across bottom (between corners)
-            draw.line(
-                [(x + corner_radius, y + card_height - 1),
-                 (x + card_width - corner_radius - 1, y + card_height - 1)],
-                fill=border_colour,
-                width=border_size
-            )
-
-            # bottom-right corner arc
-            draw.arc(
-                [x + card_width - corner_radius * 2 - 1, y + card_height - corner_radius * 2 - 1,
-                 x + card_width - 1, y + card_height - 1],
-                0, 90,
-                fill=border_colour,
-                width=border_size
-            )
+    border_colour = (0, 0, 0, 100)  # black, mostly transparent
+    widths = (side * scale, top * scale, base * scale)
+
+    # one card drawn with room around it for strokes that overhang the box
+    # and for the gutter that goes with each cell
+    pad = max(max(widths), card_spacing) + 1
+    card = Image.new('RGBA', (card_width + 2 * pad, card_height + 2 * pad), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(card)
+    draw_rounded_rectangle(draw, pad, pad, pad + card_width - 1, pad + card_height - 1,
+                           radius, fill_colour, outline_colour, 0)
+    fill = np.asarray(card).copy()
+    draw_card_border(draw, pad, pad, card_width, card_height, radius, *widths, border_colour)
+    stamp = np.asarray(card)
+
+    # how far the drawn card reaches outside its box on each side
+    ys, xs = np.nonzero(stamp[:, :, 3])
+    left = max(0, pad - xs.min())
+    top_spill = max(0, pad - ys.min())
+    right = max(0, xs.max() - (pad + card_width - 1))
+    bottom = max(0, ys.max() - (pad + card_height - 1))
+
+    sheet = np.zeros((total_height, total_width, 4), dtype=np.uint8)
+
+    if left + right <= card_spacing and top_spill + bottom <= card_spacing:
+        # overhang fits in the gutters, so every cell (card plus its share
+        # of gutter) is identical: one broadcast copy fills the whole grid
+        cell = stamp[pad - top_spill:pad - top_spill + card_height + card_spacing,
+                     pad - left:pad - left + card_width + card_spacing]
+        grid = np.broadcast_to(cell, (cards_down, cards_across) + cell.shape)
+        x0 = card_spacing - left
+        y0 = card_spacing - top_spill
+        sheet[y0:y0 + cards_down * cell.shape[0], x0:x0 + cards_across * cell.shape[1]] = \
+            grid.transpose(0, 2, 1, 3, 4).reshape(cards_down * cell.shape[0],
+                                                  cards_across * cell.shape[1], 4)
+    else:
+        # wide borders reach past the gutter into the next card: lay all the
+        # fills first, then each card's border strokes over its neighbours
+        cell = fill[pad:pad + card_height + card_spacing, pad:pad + card_width + card_spacing]
+        grid = np.broadcast_to(cell, (cards_down, cards_across) + cell.shape)
+        sheet[card_spacing:, card_spacing:] = grid.transpose(0, 2, 1, 3, 4).reshape(
+            cards_down * cell.shape[0], cards_across * cell.shape[1], 4)
+
+        border = stamp.copy()
+        border[fill[:, :, 3] == stamp[:, :, 3]] = 0
+        stroke = np.any(border != 0, axis=2) | (stamp[:, :, 3] != fill[:, :, 3])
+        for row in range(cards_down):
+            for col in range(cards_across):
+                x = card_spacing + col * (card_width + card_spacing) - pad
+                y = card_spacing + row * (card_height + card_spacing) - pad
+                sx0, sy0 = max(0, -x), max(0, -y)
+                sx1 = min(stamp.shape[1], total_width - x)
+                sy1 = min(stamp.shape[0], total_height - y)
+                region = sheet[y + sy0:y + sy1, x + sx0:x + sx1]
+                mask = stroke[sy0:sy1, sx0:sx1]
+                region[mask] = stamp[sy0:sy1, sx0:sx1][mask]
+
+    return Image.fromarray(sheet, 'RGBA')
+
+
+def blank_template_path(side=1, top=1, base=1, scale=2, corner_radius=7):
+    return (f"dev/art/cards_blank_56x78_corner-{corner_radius}"
+            f"_side-{side}-top-{top}-base-{base}_scale-{scale}.png")
+
+
+def create_blank_cards_template(side=1, top=1, base=1, scale=2, corner_radius=7,
+                                cards_across=3, cards_down=19, output_path=None):
+    """make deck of blank playing cards and save it as a PNG template"""
+    img = render_blank_cards(side, top, base, scale, corner_radius, cards_across, cards_down)
+
+    print(f"Making blank cards template: {img.width}x{img.height}px")
+    print(f"Card size: {56 * scale}x{78 * scale}px")
 
     # save the blank template
-    #output_path = "dev/art/cards_blank_56x78_corner-7_edge-0_scale-4.png"
-    # output_path = "dev/art/cards_blank_56x78_corner-7_edge-0-top-1_scale-2.png"
-    output_path = "dev/art/cards_blank_56x78_corner-7_side-1-top-1-base-1_scale-2.png"
+    if output_path is None:
+        output_path = blank_template_path(side, top, base, scale, corner_radius)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     img.save(output_path)
     print(f"Saved blank cards template at: {output_path}")
@@ -141,5 +194,17 @@ def draw_rounded_rectangle(draw, x1, y1, x2, y2, radius, fill, outline, width):
 
 
 if __name__ == "__main__":
-    template_path = create_blank_cards_template()
+    parser = argparse.ArgumentParser(description='Make a sheet of blank playing cards')
+    parser.add_argument('--side', type=int, default=1, help='side border style (0-3)')
+    parser.add_argument('--top', type=int, default=1, help='top border style (0-3)')
+    parser.add_argument('--base', type=int, default=1, help='base/bottom border style (0-3)')
+    parser.add_argument('--scale', type=int, default=2, help='scale factor (1-32)')
+    parser.add_argument('--corner', type=int, default=7, help='corner radius before scaling')
+    parser.add_argument('--across', type=int, default=3, help='cards per row')
+    parser.add_argument('--down', type=int, default=19, help='rows of cards')
+    parser.add_argument('--output', help='output PNG path')
+    args = parser.parse_args()
+
+    template_path = create_blank_cards_template(args.side, args.top, args.base, args.scale,
+                                                args.corner, args.across, args.down, args.output)
     print(f"\nBlank template ready at: {template_path}")
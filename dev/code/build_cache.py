@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+
+from art_cache import file_digest
+from sheet_io import atomic_copy, atomic_write_json
+
+# rendered sheets are kept by input hash, plus a small state file per output
+BUILD_CACHE_DIR = "dev/.build-cache"
+
+
+def build_key(inputs):
+    """one hash over every input digest and parameter"""
+    blob = json.dumps(inputs, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _state_path(output_path):
+    return os.path.join(BUILD_CACHE_DIR, "state", os.path.basename(output_path) + ".json")
+
+
+def _sheet_path(key, ext):
+    return os.path.join(BUILD_CACHE_DIR, "sheets", key + ext)
+
+
+def _load_state(output_path):
+    try:
+        with open(_state_path(output_path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def check_build(output_path, inputs):
+    """None if output_path is current for inputs, otherwise why it is not"""
+    state = _load_state(output_path)
+    if state is None:
+        return "there is no previous build"
+    if not os.path.exists(output_path):
+        return "the output file is missing"
+
+    previous = state.get("inputs", {})
+    changed = sorted(name for name in set(previous) | set(inputs)
+                     if previous.get(name) != inputs.get(name))
+    if changed:
+        return ", ".join(changed) + " changed"
+
+    if file_digest(output_path) != state.get("output"):
+        return "the output file was modified outside the build"
+    return None
+
+
+def restore_cached(output_path, inputs):
+    """copy a sheet built earlier from identical inputs into place, if there is one"""
+    cached = _sheet_path(build_key(inputs), os.path.splitext(output_path)[1])
+    if not os.path.exists(cached):
+        return False
+    atomic_copy(cached, output_path)
+    return True
+
+
+def record_build(output_path, inputs):
+    """remember output_path as the result of inputs"""
+    key = build_key(inputs)
+    cached = _sheet_path(key, os.path.splitext(output_path)[1])
+    if not os.path.exists(cached):
+        atomic_copy(output_path, cached)
+
+    state = {"key": key, "inputs": inputs, "output": file_digest(output_path)}
+    atomic_write_json(state, _state_path(output_path))
@@ -1,8 +1,8 @@
 # older script making PNG of cards the same size as in Tutorial
-from PIL import Image, ImageDraw, ImageFont
-import os
-import shutil
-from datetime import datetime
+from PIL import Image, ImageDraw
+from font_registry import get_font
+from sheet_archive import archive_file
+from sheet_io import atomic_save
 
 def generate_cards():
     # card dimensions and layout
@@ -35,9 +35,9 @@ def generate_cards():
     try:
         img = Image.open(input_path)
         draw = ImageDraw.Draw(img)
-        phFont = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
-        fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 13)
-        fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 15)
+        phFont = get_font("Arial", 24)
+        fontsmall = get_font("Arial", 13)
+        fontSymbol = get_font("Arial", 15)
         
         # generate 52 cards (4 suits × 13 values)
         card_position = 0
@@ -89,15 +89,11 @@ def generate_cards():
                 
                 card_position += 1
         
-        # backup existing file before saving
-        if os.path.exists(output_path):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-            backup_path = f"dev/art/archive/cards_{timestamp}.png"
-            shutil.copy2(output_path, backup_path)
-            print(f"Backed up existing cards image to: {backup_path}")
+        # archive the previous version before overwriting
+        archive_file(output_path, "cards")
 
         # save the result
-        img.save(output_path)
+        atomic_save(img, output_path)
         print(f"Generated cards saved to: {output_path}")
         print(f"Created {card_position} cards")
         print("Card backs (positions 53-57) left unchanged")
@@ -1,7 +1,7 @@
-from PIL import Image, ImageDraw, ImageFont
-import os
-import shutil
-from datetime import datetime
+from PIL import Image, ImageDraw
+from font_registry import get_font
+from sheet_archive import archive_file
+from sheet_io import atomic_save
 
 def generate_cards():
     # card dimensions and layout
@@ -32,10 +32,10 @@ def generate_cards():
         img = Image.open(input_path)
         draw = ImageDraw.Draw(img)
         # font for placeholder text
-        phFont = ImageFont.truetype("/System/Library/Fonts/Verdana.ttf", 38)
+        phFont = get_font("Verdana", 38)
         # font for top-left identifier
-        fontsmall = ImageFont.truetype("/System/Library/Fonts/Verdana.ttf", 20)
-        fontSymbol = ImageFont.truetype("/System/Library/Fonts/Apple Symbols.ttf", 24)  # was 15           
+        fontsmall = get_font("Verdana", 20)
+        fontSymbol = get_font("Apple Symbols", 24)  # was 15           
         
         # generate 52 cards (4 suits × 13 values)
         card_position = 0
@@ -94,9 +94,9 @@ def generate_cards():
 
                 #4. suit symbol, diamond small in font
                 if (suitLetter == 'd'):
-                  fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 27)    
+                  fontSymbol = get_font("Arial", 27)    
                 else:
-                  fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24)
+                  fontSymbol = get_font("Arial", 24)
 
                 topIndent = -2
                 rightIndent = 21
@@ -116,15 +116,11 @@ def generate_cards():
                 
                 card_position += 1
         
-        # backup existing file before saving
-        if os.path.exists(output_path):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-            backup_path = f"dev/art/archive/cards_{timestamp}.png"
-            shutil.copy2(output_path, backup_path)
-            print(f"Backed up existing cards image to: {backup_path}")
+        # archive the previous version before overwriting
+        archive_file(output_path, "cards_edge-0")
 
         # save the result
-        img.save(output_path)
+        atomic_save(img, output_path)
         print(f"Generated cards saved to: {output_path}")
         print(f"Created {card_position} cards")
         print("Card backs (positions 53-57) left unchanged")
@@ -2,6 +2,7 @@
  
 from PIL import Image, ImageDraw, ImageFont
 import os
+from font_registry import get_font
 
 def create_png_card_from_svg_design(value, colour_rgb, filename):
     """create PNG card using the SVG design with Pillow for sharper rendering"""
@@ -27,9 +28,9 @@ def create_png_card_from_svg_design(value, colour_rgb, filename):
     # load fonts at high resolution
     try:
         # large font for main text
-        large_font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 54 * scale)
+        large_font = get_font("Arial", 54 * scale)
         # small font for identifier
-        small_font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 24 * scale)
+        small_font = get_font("Arial", 24 * scale)
     except:
         # fallback fonts
         large_font = ImageFont.load_default()
@@ -1,29 +1,238 @@
-import subprocess
+import argparse
+import os
 import sys
+import time
 
+from pipeline import Stage, PipelineError, run_pipeline, report_timings
+from deck_maker import (FEATHER_FRAME, ALTERNATE_FRAME, TALONS_FRAME, FRAME_COUNT, deck_output_path,
+                        card_geometry, frame_origin, draw_frame, deck_inputs,
+                        add_variant_arguments, check_variant_arguments)
+from build_cache import record_build
+from sheet_archive import archive_file
 
-def run_script(script_name):    
-    result = subprocess.run([sys.executable, script_name], capture_output=True, text=True)
-    
-    if result.stdout:
-        print(result.stdout)
-    
-    if result.stderr:
-        print(f"Errors from {script_name}:", file=sys.stderr)
-        print(result.stderr, file=sys.stderr)
-    
-    if result.returncode != 0:
-        print(f"\nError: {script_name} failed by {result.returncode}")
+
+def _frame_tile(blank, position, scale):
+    """frame position drawn on its own crop of the blank sheet"""
+    xt, yt = frame_origin(position, *card_geometry(scale))
+    card_width, card_height, _ = card_geometry(scale)
+    return draw_frame(blank.crop((xt, yt, xt + card_width, yt + card_height)), position, scale)
+
+
+def faces(blank, scale):
+    img = blank.copy()
+    for position in range(52):
+        img.paste(_frame_tile(blank, position, scale), frame_origin(position, *card_geometry(scale)))
+    return img
+
+
+def feather_back(blank, scale):
+    return _frame_tile(blank, FEATHER_FRAME, scale)
+
+
+def alternate_back(blank, scale):
+    return _frame_tile(blank, ALTERNATE_FRAME, scale)
+
+
+def talons_back(blank, scale):
+    return _frame_tile(blank, TALONS_FRAME, scale)
+
+
+def assemble(faces, feather_back, alternate_back, talons_back, scale):
+    # faces is only consumed here, so the backs go straight onto it
+    for position, tile in ((FEATHER_FRAME, feather_back), (ALTERNATE_FRAME, alternate_back),
+                           (TALONS_FRAME, talons_back)):
+        faces.paste(tile, frame_origin(position, *card_geometry(scale)))
+    return faces
+
+
+# optional stages import their modules when they run, so a plain build
+# loads only what it needs
+def atlas(deck, scale, atlas_name):
+    from atlas_packer import split_sheet, pack_atlas
+    frames = split_sheet(deck, *card_geometry(scale), FRAME_COUNT)
+    return pack_atlas(frames, atlas_name)
+
+
+def index(deck, scale):
+    from sheet_palette import index_sheet
+    return index_sheet(deck, scale)
+
+
+def recolour(deck, side, top, base, scale, theme):
+    from sheet_recolour import THEMES, recolour_sheet
+    themed, _ = recolour_sheet(deck, THEMES[theme], side, top, base, scale)
+    return themed
+
+
+def lint(deck, blank, scale):
+    import numpy as np
+    from sheet_lint import lint_sheet
+    return lint_sheet(np.asarray(deck), np.asarray(blank), scale)
+
+
+def encode(deck):
+    from sheet_encoder import encode_sheet
+    data, _, report = encode_sheet(deck)
+    return data, report
+
+
+PARAMETERS = ("side", "top", "base", "scale")
+
+STAGES = [
+    # through load_blank, so deck_inputs finds the blank already made
+    Stage("blank", "deck_maker:load_blank", PARAMETERS, ("blank",)),
+    Stage("faces", faces, ("blank", "scale"), ("faces",)),
+    Stage("feather back", feather_back, ("blank", "scale"), ("feather_back",)),
+    Stage("alternate back", alternate_back, ("blank", "scale"), ("alternate_back",)),
+    Stage("talons back", talons_back, ("blank", "scale"), ("talons_back",)),
+    Stage("assemble", assemble, ("faces", "feather_back", "alternate_back", "talons_back", "scale"),
+          ("deck",)),
+]
+
+INDEX_STAGES = [
+    Stage("index colours", index, ("deck", "scale"), ("deck_indexed",)),
+]
+
+ENCODE_STAGES = [
+    Stage("encode", encode, ("deck",), ("deck_encoded", "encode_report")),
+]
+
+ATLAS_STAGES = [
+    Stage("pack atlas", atlas, ("deck", "scale", "atlas_name"), ("atlas", "atlas_frames")),
+]
+
+RECOLOUR_STAGES = [
+    Stage("recolour", recolour, ("deck",) + PARAMETERS + ("theme",), ("deck_themed",)),
+]
+
+LINT_STAGES = [
+    Stage("lint", lint, ("deck", "blank", "scale"), ("lint",)),
+]
+
+MANIFEST_STAGES = [
+    Stage("publish atlases", "deck_manifest:publish_atlases", ("deck",) + PARAMETERS, ("manifest",)),
+]
+
+
+def _run(stages, values, artifacts=None):
+    """run_pipeline, exiting with the error when it fails"""
+    try:
+        return run_pipeline(stages, values, artifacts=artifacts)
+    except PipelineError as e:
+        print(f"Error: pipeline not runnable:\n{e}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"Error: {e}")
         sys.exit(1)
-    
-    print(f"\n✓ {script_name} completed successfully")
 
 
 def main():
-    run_script("write_deck_resize.py")
-    # run_script("cards_maker_56x78.py")
-    run_script("add_back_design.py")
-    run_script("add_alternate_back.py")    
+    parser = argparse.ArgumentParser(description='Build the deck sheet in one process')
+    add_variant_arguments(parser)
+    parser.add_argument('--atlas', action='store_true',
+                        help='also write a trimmed, deduplicated atlas with Phaser JSON')
+    parser.add_argument('--manifest', action='store_true',
+                        help='also write content-hashed faces and backs atlases and the '
+                             'manifest the game preloads')
+    parser.add_argument('--theme', help='also save a copy of the deck with its suits recoloured '
+                                        '(see sheet_recolour.py for the themes)')
+    parser.add_argument('--lint', action='store_true',
+                        help='check the deck for gutter bleed, art past the corners and '
+                             'empty or duplicate frames, and fail if any are found')
+    parser.add_argument('--indexed', action='store_true',
+                        help='save an 8-bit palette sheet when it has 256 colours or fewer')
+    parser.add_argument('--optimize', action='store_true',
+                        help='save the smallest pixel-exact PNG encoding, with a size/time report')
+    args = parser.parse_args()
+
+    # the blank renderer goes up to 32 for supersampling, shipped sheets stop at 8
+    check_variant_arguments(args)
+
+    values = {"side": args.side, "top": args.top, "base": args.base, "scale": args.scale}
+    output_path = deck_output_path(args.side, args.top, args.base, args.scale)
+    stages = list(STAGES)
+    artifacts = {"deck": output_path}
+
+    if args.indexed and args.optimize:
+        print("Error: --indexed and --optimize are exclusive, --optimize already tries a palette")
+        sys.exit(1)
+    if args.indexed:
+        stages += INDEX_STAGES
+        artifacts = {"deck_indexed": output_path}
+    if args.optimize:
+        stages += ENCODE_STAGES
+        artifacts = {"deck_encoded": output_path,
+                     "encode_report": os.path.splitext(output_path)[0] + "_encoding.json"}
+
+    if args.atlas:
+        atlas_path = os.path.splitext(output_path)[0] + "_atlas.png"
+        values["atlas_name"] = os.path.basename(atlas_path)
+        stages += ATLAS_STAGES
+        artifacts["atlas"] = atlas_path
+        artifacts["atlas_frames"] = os.path.splitext(atlas_path)[0] + ".json"
+
+    if args.theme:
+        from sheet_recolour import THEMES, themed_path
+        if args.theme not in THEMES:
+            print(f"Error: unknown theme {args.theme}; choose from {', '.join(THEMES)}")
+            sys.exit(1)
+        values["theme"] = args.theme
+        stages += RECOLOUR_STAGES
+        artifacts["deck_themed"] = themed_path(args.side, args.top, args.base, args.scale,
+                                               args.theme)
+
+    if args.lint:
+        stages += LINT_STAGES
+
+    if args.manifest:
+        from deck_manifest import MANIFEST_PATH
+        artifacts["manifest"] = MANIFEST_PATH
+
+    start = time.perf_counter()
+    values, timings = _run(stages, values)
+
+    # checked before anything is published or saved, so a sheet that fails
+    # never replaces the good one
+    if args.lint:
+        from sheet_lint import frame_problems, frame_label
+        failing = 0
+        for position in range(FRAME_COUNT):
+            problems = frame_problems(values["lint"], position)
+            if problems:
+                failing += 1
+                print(f"✗ frame {position} ({frame_label(position)}): {'; '.join(problems)}")
+        if failing:
+            print(f"Error: lint found problems in {failing} frames, nothing was saved")
+            sys.exit(1)
+        print("✓ lint found no problems")
+
+    if args.manifest:
+        values, publish_timings = _run(MANIFEST_STAGES, values)
+        timings += publish_timings
+
+    # sheets about to be replaced go to the archive, as deck_maker's do,
+    # once every stage has succeeded and they really will be
+    params = {"side": args.side, "top": args.top, "base": args.base, "scale": args.scale}
+    archive_file(output_path, "cards", params)
+    if args.theme:
+        archive_file(artifacts["deck_themed"], "cards_themed", dict(params, theme=args.theme))
+    if args.atlas:
+        archive_file(artifacts["atlas"], "cards_atlas", params)
+    _, save_timings = _run([], values, artifacts)
+    timings += save_timings
+
+    if args.manifest:
+        # only now that the manifest points at the new atlases
+        from deck_manifest import prune_published
+        prune_published(values["manifest"], args.side, args.top, args.base, args.scale)
+
+    # an optimized or indexed deck has the same pixels as a plain render;
+    # recording it keeps deck_maker from rebuilding over it
+    record_build(output_path, deck_inputs(args.side, args.top, args.base, args.scale))
+
+    for name, path in artifacts.items():
+        print(f"✓ {name} saved to: {path}")
+    report_timings(timings, time.perf_counter() - start)
 
 
 if __name__ == "__main__":
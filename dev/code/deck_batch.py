@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import itertools
+import os
+import sys
+import time
+
+from art_cache import load_art
+from deck_maker import (SUIT_ART, FEATHER_PATH, ALTERNATE_BACK_PATH, TALONS_BACK_PATH, SCALES, SUPERSAMPLE_LEVELS,
+                        QUALITIES, BORDER_STYLES, deck_output_path, parse_choices, render_deck,
+                        deck_inputs)
+from sheet_io import atomic_save
+from sheet_archive import archive_file, wait_for_archives
+from build_cache import check_build, restore_cached, record_build
+
+# 'all' scales means the hi-DPI family @1x to @4x; up to 8 can be listed
+FAMILY_SCALES = [1, 2, 3, 4]
+
+
+def get_batch_parameters(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Render every side/top/base/scale combination of the deck without prompting')
+    parser.add_argument('--side', default='all', help="side border styles, e.g. 0,1 or all")
+    parser.add_argument('--top', default='all', help="top border styles, e.g. 1 or all")
+    parser.add_argument('--base', default='all', help="base border styles, e.g. 1,3 or all")
+    parser.add_argument('--scale', default='all', help="scale factors, e.g. 2 or 1,2,3 (all: @1x to @4x)")
+    parser.add_argument('--supersample', type=int, choices=SUPERSAMPLE_LEVELS, default=1,
+                        help='draw the blank and glyphs this many times larger, then reduce')
+    parser.add_argument('--quality', choices=QUALITIES, default="box",
+                        help='reduction filter: box uses Image.reduce, lanczos is slower and sharper')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='worker processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    try:
+        sides = parse_choices(args.side, BORDER_STYLES, 'side')
+        tops = parse_choices(args.top, BORDER_STYLES, 'top')
+        bases = parse_choices(args.base, BORDER_STYLES, 'base')
+        scales = parse_choices(args.scale, SCALES, 'scale', FAMILY_SCALES)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    variants = list(itertools.product(sides, tops, bases, scales))
+    return variants, max(1, args.workers or 1), args.supersample, args.quality
+
+
+def _init_worker():
+    # decode the shared art once per worker, before any variant needs it;
+    # blanks are generated in memory and cached per worker as they come up
+    for path in list(SUIT_ART.values()) + [FEATHER_PATH, ALTERNATE_BACK_PATH, TALONS_BACK_PATH]:
+        load_art(path)
+
+
+def build_variant(variant, supersample=1, quality="box"):
+    """render and save one variant unless it is up to date
+
+    Returns (variant, seconds, output_path, status, error, archived), with
+    archived the archive's report lines for the sheet it replaced.
+    """
+    side, top, base, scale = variant
+    start = time.perf_counter()
+    output_path = deck_output_path(side, top, base, scale)
+    try:
+        inputs = deck_inputs(side, top, base, scale, supersample, quality)
+        reason = check_build(output_path, inputs)
+        if reason is None:
+            status = "up to date"
+        else:
+            archive_file(output_path, "cards", {"side": side, "top": top, "base": base, "scale": scale})
+            if restore_cached(output_path, inputs):
+                status = f"restored, {reason}"
+            else:
+                img = render_deck(side, top, base, scale, supersample=supersample, quality=quality)
+                atomic_save(img, output_path)
+                status = f"rebuilt, {reason}"
+            record_build(output_path, inputs)
+        error = None
+    except Exception as e:
+        status = None
+        error = str(e)
+    # pool workers exit without joining threads, so the ingest finishes here
+    archived = wait_for_archives()
+    return variant, time.perf_counter() - start, output_path, status, error, archived
+
+
+def print_timing_table(results):
+    print(f"\n{'side':>4} {'top':>4} {'base':>4} {'scale':>5} {'ms':>8}  result")
+    for (side, top, base, scale), seconds, output_path, status, error, _ in results:
+        outcome = f"error: {error}" if error else f"{os.path.basename(output_path)} ({status})"
+        print(f"{side:>4} {top:>4} {base:>4} {scale:>5} {seconds * 1000:>8.1f}  {outcome}")
+
+
+def run_batch(variants, workers, supersample=1, quality="box"):
+    print(f"Rendering {len(variants)} variants on {workers} workers...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(build_variant, variant, supersample, quality) for variant in variants]
+        for future in as_completed(futures):
+            results.append(future.result())
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda result: variants.index(result[0]))
+    print_timing_table(results)
+    for result in results:
+        for report in result[5]:
+            print(report)
+
+    failed = [result for result in results if result[4]]
+    print(f"\n{len(results) - len(failed)} built, {len(failed)} failed in {elapsed:.2f}s")
+    return not failed
+
+
+if __name__ == "__main__":
+    variants, workers, supersample, quality = get_batch_parameters()
+    sys.exit(0 if run_batch(variants, workers, supersample, quality) else 1)
@@ -0,0 +1,219 @@
+from PIL import ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from blank_deck_maker import create_blank_cards_template, render_blank_cards
+from deck_maker import (SCALES, card_geometry, draw_card_faces, add_feather_back,
+                        add_alternate_back, add_talons_back, render_deck)
+from sheet_io import atomic_write_json
+
+BENCH_SCALES = [1, 2, 3, 4]
+BENCH_OUTPUT = "dev/.build-cache/bench/latest.json"
+
+
+def _blank_case(scale):
+    # the save is part of the timing, overwritten on every run
+    output_path = os.path.join(os.path.dirname(BENCH_OUTPUT), f"blank_scale-{scale}.png")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_blank_cards_template(1, 1, 1, scale, output_path=output_path)
+    return run
+
+
+def _drawing_case(draw_step, scale):
+    # every run draws on a fresh blank, the copy is part of the timing
+    blank = render_blank_cards(1, 1, 1, scale)
+    geometry = card_geometry(scale)
+
+    def run():
+        img = blank.copy()
+        draw_step(img, scale, *geometry)
+    return run
+
+
+def _faces(img, scale, card_width, card_height, card_spacing):
+    draw_card_faces(img, ImageDraw.Draw(img), scale, card_width, card_height, card_spacing)
+
+
+def _encode_case(scale):
+    with contextlib.redirect_stdout(io.StringIO()):
+        sheet = render_deck(1, 1, 1, scale)
+
+    def run():
+        sheet.save(io.BytesIO(), format="PNG")
+    return run
+
+
+CASES = {
+    "create_blank_cards_template": _blank_case,
+    "draw_card_faces": lambda scale: _drawing_case(_faces, scale),
+    "add_feather_back": lambda scale: _drawing_case(add_feather_back, scale),
+    "add_alternate_back": lambda scale: _drawing_case(add_alternate_back, scale),
+    "add_talons_back": lambda scale: _drawing_case(add_talons_back, scale),
+    "encode png": _encode_case,
+}
+
+
+def percentile(sorted_values, fraction):
+    # nearest-rank, good enough for tens of samples
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def reset_peak_rss():
+    """start the peak over from the current RSS; False where the kernel can't (not Linux)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _proc_status_kb(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_kb():
+    peak = _proc_status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(name, scale, warmup, repeat):
+    """timings for one case, in its own process so peak RSS is its own
+
+    Where the platform allows, the peak is reset once the case is set up
+    (for the encode case, once its sheet is rendered), and rss_growth_kb
+    is how far the timed runs took it above what setup left resident.
+    """
+    run = CASES[name](scale)
+    setup_included = not reset_peak_rss()
+    setup_rss = _proc_status_kb("VmRSS") or 0
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "case": name,
+        "scale": scale,
+        "runs": repeat,
+        "median_ms": percentile(samples, 0.5),
+        "p95_ms": percentile(samples, 0.95),
+        "min_ms": samples[0],
+        "peak_rss_kb": peak_rss_kb(),
+        "rss_includes_setup": setup_included,
+        "rss_growth_kb": None if setup_included else peak_rss_kb() - setup_rss,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names, scales, warmup, repeat):
+    results = []
+    for name in names:
+        for scale in scales:
+            # a fresh single-use worker per case keeps caches and RSS separate
+            with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+                results.append(pool.submit(run_case, name, scale, warmup, repeat).result())
+            print_result(results[-1])
+    return {"commit": git_commit(), "warmup": warmup, "repeat": repeat, "results": results}
+
+
+def print_result(result):
+    print(f"{result['case']:<28} @{result['scale']}x {result['median_ms']:>9.2f} ms median "
+          f"{result['p95_ms']:>9.2f} ms p95 {result['peak_rss_kb'] / 1024:>7.1f} MB rss"
+          + ("" if result.get("rss_growth_kb") is None
+             else f" (+{result['rss_growth_kb'] / 1024:.1f} MB over setup)"))
+
+
+def compare(report, baseline, threshold):
+    """(case, scale, old, new, change) for medians more than threshold slower"""
+    old = {(r["case"], r["scale"]): r["median_ms"] for r in baseline["results"]}
+    regressions = []
+    print(f"\nAgainst baseline {baseline.get('commit') or '(unknown commit)'}:")
+    for result in report["results"]:
+        key = (result["case"], result["scale"])
+        if key not in old:
+            continue
+        change = result["median_ms"] / old[key] - 1 if old[key] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"  {key[0]:<28} @{key[1]}x {old[key]:>9.2f} -> {result['median_ms']:>9.2f} ms "
+              f"({change:+.0%}){flag}")
+        if flag:
+            regressions.append((*key, old[key], result["median_ms"], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each stage of the deck pipeline at scales 1-4')
+    parser.add_argument('--case', action='append', choices=list(CASES),
+                        help='case to run, repeatable (default: all)')
+    parser.add_argument('--scale', default=",".join(map(str, BENCH_SCALES)),
+                        help='comma separated scales (default: 1,2,3,4)')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed runs first')
+    parser.add_argument('--repeat', type=int, default=15, help='timed runs per case')
+    parser.add_argument('--output', default=BENCH_OUTPUT, help='JSON results path')
+    parser.add_argument('--baseline', help='earlier results JSON to compare medians against')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='percent slowdown counted as a regression (default: 10)')
+    args = parser.parse_args()
+
+    try:
+        scales = [int(part) for part in args.scale.split(",") if part.strip()]
+    except ValueError:
+        print(f'Error: scales must be integers, got {args.scale!r}')
+        sys.exit(1)
+    bad = [scale for scale in scales if scale not in SCALES]
+    if bad or not scales:
+        print(f'Error: scales must be {SCALES[0]}-{SCALES[-1]}, got {args.scale!r}')
+        sys.exit(1)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'Error: cannot read baseline {args.baseline}: {e}')
+            sys.exit(1)
+
+    report = run_benchmarks(args.case or list(CASES), scales, args.warmup, max(1, args.repeat))
+    atomic_write_json(report, args.output)
+    print(f"\nSaved results to: {args.output}")
+
+    if baseline is not None and compare(report, baseline, args.threshold / 100):
+        print(f"\nError: slower than baseline by more than {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
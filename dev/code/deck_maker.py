@@ -1,9 +1,112 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw
 import os
 import sys
-import shutil
 import argparse
-from datetime import datetime
+import hashlib
+from functools import lru_cache
+from font_registry import report_font_loads, font_digest
+from glyph_stamps import stamp_text
+from back_tiling import Lattice, paste_pattern
+from art_cache import load_scaled_art, report_art_loads, file_digest, art_digest
+from sheet_io import atomic_save
+from sheet_archive import archive_file
+from build_cache import check_build, restore_cached, record_build
+from frame_cache import cached_frame, report_frame_renders
+from blank_deck_maker import render_blank_cards
+from deck_profiler import start_profile, stop_profile, stage, report_profile, profile_dump
+
+
+SUIT_ART = {
+    's': "public/assets/images/owl_1a.png",
+    'c': "public/assets/images/crow.png",
+    'h': "public/assets/images/eagle.png",
+    'd': "public/assets/images/red-kite-3.png",
+}
+FEATHER_PATH = "public/assets/images/feather.png"
+ALTERNATE_BACK_PATH = "public/assets/images/card-back-alternate.png"
+TALONS_BACK_PATH = "public/assets/images/card-back-C.png"
+
+# the modules whose code decides a frame's pixels: colour tables, glyph
+# offsets, tiling and art scaling. Their source is hashed into every frame
+# and build key, so any edit to them invalidates cached frames and sheets
+RENDERER_MODULES = ("deck_maker.py", "glyph_stamps.py", "back_tiling.py", "art_cache.py")
+
+# sheet layout in card units, one unit is scale pixels
+CARD_UNITS = (56, 78)
+SPACING_UNITS = 1
+SCALES = range(1, 9)
+BORDER_STYLES = range(4)
+# supersampling factors and the filters that reduce them
+SUPERSAMPLE_LEVELS = (1, 2, 3, 4)
+QUALITIES = ("box", "lanczos")
+
+CARDS_ACROSS = 3
+CARDS_DOWN = 19
+FRAME_COUNT = CARDS_ACROSS * CARDS_DOWN
+TALONS_FRAME = 54
+ALTERNATE_FRAME = 55
+FEATHER_FRAME = 56
+
+# feathers 6 by 9, columns 1 and 4 half a feather lower and one shorter,
+# the right half mirrored
+FEATHER_LATTICE = Lattice(6, 9, offset_columns=(1, 4), mirror_x=True,
+                          skip=lambda col, row: col in (1, 4) and row >= 8)
+
+SUIT_COLOURS = [
+    (90, 90, 90),     # clubs - dark grey
+    (237, 74, 123),   # diamonds - light red
+    (255, 15, 15),    # hearts - red
+    (20, 20, 20)      # spades - black
+]
+CARD_VALUES = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+SUIT_SYMBOLS = ['♣', '♦', '♥', '♠']
+SUIT_LETTERS = ['c', 'd', 'h', 's']
+# the top-right suit symbol: font size, top offset and right indent, in card units
+SUIT_SYMBOL_LAYOUT = {
+    'c': (34, -6, 27),
+    'd': (36, -7, 24),
+    'h': (34, -6, 26),
+    's': (36, -8, 24),
+}
+
+
+def add_variant_arguments(parser, scale=2, scales=SCALES):
+    """the --side/--top/--base/--scale options of the single-sheet tools
+
+    scale is the default scale, or None for a tool that takes no --scale.
+    """
+    parser.add_argument('--side', type=int, default=1, help='side border style (0-3)')
+    parser.add_argument('--top', type=int, default=1, help='top border style (0-3)')
+    parser.add_argument('--base', type=int, default=1, help='base/bottom border style (0-3)')
+    if scale is not None:
+        parser.add_argument('--scale', type=int, default=scale,
+                            help=f'scale factor ({scales[0]}-{scales[-1]})')
+
+
+def check_variant_arguments(args, scales=SCALES):
+    """exit with an error if a border style or the scale is out of range"""
+    for name in ('side', 'top', 'base'):
+        if getattr(args, name) not in BORDER_STYLES:
+            print(f'Error: {name} must be {BORDER_STYLES[0]}-{BORDER_STYLES[-1]}, '
+                  f'got {getattr(args, name)}')
+            sys.exit(1)
+    if getattr(args, 'scale', None) is not None and args.scale not in scales:
+        print(f'Error: scale must be {scales[0]}-{scales[-1]}, got {args.scale}')
+        sys.exit(1)
+
+
+def parse_choices(text, allowed, name, everything=None):
+    """'all' or a comma separated list such as '0,2,3'"""
+    if text == "all":
+        return list(allowed if everything is None else everything)
+    try:
+        values = [int(part) for part in text.split(",") if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name} must be 'all' or a list of integers, got {text!r}")
+    bad = [v for v in values if v not in allowed]
+    if bad or not values:
+        raise argparse.ArgumentTypeError(f"{name} values must be in {list(allowed)}, got {text!r}")
+    return values
 
 
 def get_parameters():
@@ -11,9 +114,23 @@ def get_parameters():
     parser.add_argument('--side', type=int, help='side border style (0-3)')
     parser.add_argument('--top', type=int, help='top border style (0-3)')
     parser.add_argument('--base', type=int, help='base/bottom border style (0-3)')
-    parser.add_argument('--scale', type=int, help='scale factor (1-2)')
+    parser.add_argument('--scale', type=int, help='scale factor (1-8)')
+    parser.add_argument('--supersample', type=int, choices=SUPERSAMPLE_LEVELS, default=1,
+                        help='draw the blank and glyphs this many times larger, then reduce')
+    parser.add_argument('--quality', choices=QUALITIES, default="box",
+                        help='reduction filter: box uses Image.reduce, lanczos is slower and sharper')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='DUMP',
+                        help='report stage timings, memory and Pillow call counts; '
+                             'DUMP.prof also saves cProfile stats, any other DUMP collapsed stacks')
     args = parser.parse_args()
 
+    # without a terminal (CI, batch jobs) take the defaults instead of prompting
+    if not sys.stdin.isatty():
+        args.side = 1 if args.side is None else args.side
+        args.top = 1 if args.top is None else args.top
+        args.base = 1 if args.base is None else args.base
+        args.scale = 2 if args.scale is None else args.scale
+
     # prompt for missing parameters with defaults
     if args.side is None:
         side_input = input('Enter side value (0-3) [default: 1]: ').strip()
@@ -28,281 +145,396 @@ def get_parameters():
         args.base = int(base_input) if base_input else 1
 
     if args.scale is None:
-        scale_input = input('Enter scale (1-2) [default: 2]: ').strip()
+        scale_input = input('Enter scale (1-8) [default: 2]: ').strip()
         args.scale = int(scale_input) if scale_input else 2
 
-    # validate ranges
-    if not 0 <= args.side <= 3:
-        print(f'Error: side must be 0-3, got {args.side}')
-        sys.exit(1)
-    if not 0 <= args.top <= 3:
-        print(f'Error: top must be 0-3, got {args.top}')
-        sys.exit(1)
-    if not 0 <= args.base <= 3:
-        print(f'Error: base must be 0-3, got {args.base}')
-        sys.exit(1)
-    if not 1 <= args.scale <= 2:
-        print(f'Error: scale must be 1-2, got {args.scale}')
-        sys.exit(1)
+    check_variant_arguments(args)
+
+    return args.side, args.top, args.base, args.scale, args.supersample, args.quality, args.profile
+
+
+@lru_cache(maxsize=None)
+def card_geometry(scale):
+    """(card_width, card_height, card_spacing) in pixels at scale"""
+    card_width, card_height = CARD_UNITS
+    return card_width * scale, card_height * scale, SPACING_UNITS * scale
+
+
+def frame_origin(position, card_width, card_height, card_spacing, cards_across=CARDS_ACROSS):
+    """top-left pixel of a frame in the 3-across sheet"""
+    row = position // cards_across
+    col = position % cards_across
+    xt = card_spacing + col * (card_width + card_spacing)
+    yt = card_spacing + row * (card_height + card_spacing)
+    return xt, yt
+
+
+def frame_stack(sheet, scale):
+    """(FRAME_COUNT, card_height, card_width, 4) view of a sheet array"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+    pitch_x, pitch_y = card_width + card_spacing, card_height + card_spacing
+    grid = sheet[card_spacing:card_spacing + CARDS_DOWN * pitch_y,
+                 card_spacing:card_spacing + CARDS_ACROSS * pitch_x]
+    grid = grid.reshape(CARDS_DOWN, pitch_y, CARDS_ACROSS, pitch_x, 4)
+    frames = grid[:, :card_height, :, :card_width].transpose(0, 2, 1, 3, 4)
+    return frames.reshape(CARDS_DOWN * CARDS_ACROSS, card_height, card_width, 4)[:FRAME_COUNT]
 
-    return args.side, args.top, args.base, args.scale
+
+def paste_card_art(img, xt, yt, suit_index, scale, card_width, card_height):
+    """paste bird image for the suit, centred below the header"""
+    art_img, art_mask = load_scaled_art(SUIT_ART[SUIT_LETTERS[suit_index]], scale)
+    art_x = xt + card_width // 2 - art_img.width // 2
+    art_y = yt + card_height // 2 - art_img.height // 2 + 12 * scale
+    img.paste(art_img, (art_x, art_y), art_mask)
+
+
+def draw_card_face(img, draw, xt, yt, value, suit_index, scale, card_width, card_height, art=True):
+    """draw one face with its top-left corner at (xt, yt)
+
+    art=False leaves out the bird, for supersampled faces that get it
+    pasted after reduction.
+    """
+    colour = SUIT_COLOURS[suit_index]
+    symbol = SUIT_SYMBOLS[suit_index]
+    suitLetter = SUIT_LETTERS[suit_index]
+
+    x = xt + card_width // 2
+    y = yt + card_height // 2
+
+    phMargin = 5 * scale
+    header = 28 * scale
+
+    rect_x1 = x - card_width//2 + phMargin
+    rect_y1 = y - card_height//2 + header 
+    rect_x2 = x + card_width//2 - phMargin
+    rect_y2 = y + card_height//2 - phMargin
+
+    graphic_y = rect_y1 + 4 * scale
+
+    if art:
+        paste_card_art(img, xt, yt, suit_index, scale, card_width, card_height)
+
+    # top-left identifiers visible when card stacked, pasted from
+    # glyph stamps rasterized once per glyph, size and colour
+    smallSize = 30 * scale
+    if value == '10':
+        line_width = 2 * scale
+        line_height = 19 * scale
+        line_x = xt + 7 * scale
+        line_y = yt + 5 * scale
+        draw.rectangle([line_x, line_y, line_x + line_width, line_y + line_height],
+                      fill=colour)
+        stamp_text(img, (xt + 11 * scale, yt - 2 * scale), '0', colour, "Arial", smallSize)
+
+    elif value == 'Q':
+        stamp_text(img, (xt + 4 * scale, yt - 2 * scale), value, colour, "Arial", smallSize)
+    else:
+        stamp_text(img, (xt + 6 * scale, yt - 2 * scale), value, colour, "Arial", smallSize)
+
+    # suit symbol
+    symbolSize, topIndent, rightIndent = (units * scale for units in SUIT_SYMBOL_LAYOUT[suitLetter])
+
+    stamp_text(img, (xt + card_width - rightIndent, yt + topIndent), symbol, colour, "Arial", symbolSize)
 
 
 def draw_card_faces(img, draw, scale, card_width, card_height, card_spacing):
-    cards_across = 3
-    
-    suit_colours = [
-        (90, 90, 90),     # clubs - dark grey
-        (237, 74, 123),   # diamonds - light red
-        (255, 15, 15),    # hearts - red
-        (20, 20, 20)      # spades - black
-    ]
-    
-    card_values = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-    suit_symbols = ['♣', '♦', '♥', '♠']
-    suit_letters = ['c', 'd', 'h', 's']
-    
-    phFont = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 36 * scale)
-    
     card_position = 0
     
-    for suit_index, colour in enumerate(suit_colours):
-        symbol = suit_symbols[suit_index]
-        suitLetter = suit_letters[suit_index]
-
-        for value in card_values:
+    for suit_index in range(len(SUIT_COLOURS)):
+        for value in CARD_VALUES:
             if card_position >= 52:
                 break
 
-            row = card_position // cards_across
-            col = card_position % cards_across
-
-            xt = card_spacing + col * (card_width + card_spacing)
-            yt = card_spacing + row * (card_height + card_spacing)
-          
-            x = card_spacing + col * (card_width + card_spacing) + card_width // 2
-            y = card_spacing + row * (card_height + card_spacing) + card_height // 2
-            
-            bbox = draw.textbbox((0, 0), value, font=phFont)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-
-            phMargin = 5 * scale
-            header = 28 * scale
-
-            rect_x1 = x - card_width//2 + phMargin
-            rect_y1 = y - card_height//2 + header 
-            rect_x2 = x + card_width//2 - phMargin
-            rect_y2 = y + card_height//2 - phMargin
-
-            graphic_y = rect_y1 + 4 * scale
-
-            # paste bird images based on suit
-            if suitLetter == 's':
-                owl_img = Image.open("public/assets/images/owl_1a.png")
-                if owl_img.mode != 'RGBA':
-                    owl_img = owl_img.convert('RGBA')
-                owl_x = x - 96 // 2
-                owl_y = y - 84 // 2 + 12 * scale
-                img.paste(owl_img, (owl_x, owl_y), owl_img.split()[3])
-            
-            elif suitLetter == 'c':
-                crow_img = Image.open("public/assets/images/crow.png")
-                if crow_img.mode != 'RGBA':
-                    crow_img = crow_img.convert('RGBA')
-                crow_x = x - 96 // 2
-                crow_y = y - 84 // 2 + 12 * scale
-                img.paste(crow_img, (crow_x, crow_y), crow_img.split()[3])
-
-            elif suitLetter == 'h':
-                eagle_img = Image.open("public/assets/images/eagle.png")
-                if eagle_img.mode != 'RGBA':
-                    eagle_img = eagle_img.convert('RGBA')
-                eagle_x = x - 96 // 2
-                eagle_y = y - 84 // 2 + 12 * scale
-                img.paste(eagle_img, (eagle_x, eagle_y), eagle_img.split()[3])
-
-            elif suitLetter == 'd':
-                redkite_img = Image.open("public/assets/images/red-kite-3.png")
-                if redkite_img.mode != 'RGBA':
-                    redkite_img = redkite_img.convert('RGBA')
-                redkite_x = x - 96 // 2
-                redkite_y = y - 84 // 2 + 12 * scale
-                img.paste(redkite_img, (redkite_x, redkite_y), redkite_img.split()[3])
-
-            # top-left identifiers visible when card stacked
-            if value == '10':
-                fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
-                line_width = 2 * scale
-                line_height = 19 * scale
-                line_x = xt + 7 * scale
-                line_y = yt + 5 * scale
-                draw.rectangle([line_x, line_y, line_x + line_width, line_y + line_height],
-                              fill=colour)
-                draw.text((xt + 11 * scale, yt - 2 * scale), '0', fill=colour, font=fontsmall)
-
-            elif value == 'Q':
-                fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
-                draw.text((xt + 4 * scale, yt - 2 * scale), value, fill=colour, font=fontsmall)
-            else:
-                fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
-                draw.text((xt + 6 * scale, yt - 2 * scale), value, fill=colour, font=fontsmall)
-
-            # suit symbol
-            symbolFontSize = 36
-            if suitLetter == 'h':
-                fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", (symbolFontSize-2) * scale)
-            elif suitLetter == 'c':
-                fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", (symbolFontSize-2) * scale) 
-            else:
-                fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", symbolFontSize * scale)
-
-            topIndent = -7 * scale
-            rightIndent = 24 * scale
-
-            if suitLetter == 'h':
-                topIndent = topIndent + 1 * scale
-                rightIndent = rightIndent + 2 * scale
-            elif suitLetter == 'c':
-                topIndent = topIndent + 1 * scale
-                rightIndent = rightIndent + 3 * scale
-            elif suitLetter == 's':
-                topIndent = topIndent + (-1*scale)
-            elif suitLetter == 'd':
-                topIndent = topIndent + (0*scale)
-
-            draw.text((xt + card_width - rightIndent, yt + topIndent), symbol, fill=colour, font=fontSymbol)
+            xt, yt = frame_origin(card_position, card_width, card_height, card_spacing)
+            draw_card_face(img, draw, xt, yt, value, suit_index, scale, card_width, card_height)
 
             card_position += 1
 
     return card_position
 
 
-def add_feather_back(img, scale, card_width, card_height, card_spacing):
-    cards_across = 3
-    
-    card_position = 56
-    row = card_position // cards_across
-    col = card_position % cards_across
+def draw_feather_back(img, xt, yt, scale, card_width, card_height):
+    """tile feathers over the card whose top-left corner is (xt, yt)"""
+    feather_img, _ = load_scaled_art(FEATHER_PATH, scale)
+    paste_pattern(img, feather_img, FEATHER_LATTICE,
+                  (xt + card_width // 2, yt + card_height // 2))
 
-    xt = card_spacing + col * (card_width + card_spacing)
-    yt = card_spacing + row * (card_height + card_spacing)
 
-    x = xt + card_width // 2
-    y = yt + card_height // 2
+def add_feather_back(img, scale, card_width, card_height, card_spacing):
+    xt, yt = frame_origin(FEATHER_FRAME, card_width, card_height, card_spacing)
+    draw_feather_back(img, xt, yt, scale, card_width, card_height)
 
-    feather_img = Image.open("public/assets/images/feather.png")
-    if feather_img.mode != 'RGBA':
-        feather_img = feather_img.convert('RGBA')
 
-    tiles_across = 6
-    tiles_down = 9
-    tile_size = 16
-    tiled_width = tiles_across * tile_size
-    tiled_height = tiles_down * tile_size
-    start_x = x - tiled_width // 2
-    start_y = y - tiled_height // 2
+def trimmed_back(path, scale):
+    """(image, mask, trim) for a full-card back, trimmed on all sides
 
-    for row_idx in range(tiles_down):
-        for col_idx in range(tiles_across):
-            if (col_idx == 1 or col_idx == 4) and row_idx >= 8:
-                continue
-            tile_x = start_x + col_idx * tile_size
-            tile_y = start_y + row_idx * tile_size
+    trim pixels come off each side so the back doesn't obscure the blank's
+    edge lines/curves; paste it trim pixels in from the card's corner.
+    """
+    back_img, back_mask = load_scaled_art(path, scale)
+    trimPx = 3 * scale // 2
+    width, height = back_img.size
+    trim_box = (trimPx, trimPx, width - trimPx, height - trimPx)
+    return back_img.crop(trim_box), back_mask.crop(trim_box), trimPx
 
-            if col_idx == 1 or col_idx == 4:
-                tile_y += 8
 
-            if col_idx >= 3:
-                flipped_feather = feather_img.transpose(Image.FLIP_LEFT_RIGHT)
-                img.paste(flipped_feather, (tile_x, tile_y), flipped_feather.split()[3])
-            else:
-                img.paste(feather_img, (tile_x, tile_y), feather_img.split()[3])
+def draw_alternate_back(img, xt, yt, scale, card_width, card_height):
+    """paste the alternate back onto the card whose top-left corner is (xt, yt)"""
+    alternate_img, alternate_mask, trimPx = trimmed_back(ALTERNATE_BACK_PATH, scale)
 
+    # if alternate_img.size != (card_width, card_height):
+    #     alternate_img = alternate_img.resize((card_width, card_height), Image.Resampling.LANCZOS)
+    
+    img.paste(alternate_img, (xt + trimPx, yt + trimPx), alternate_mask)
 
-def add_alternate_back(img, scale, card_width, card_height, card_spacing):
-    cards_across = 3
 
-    alternate_back_path = "public/assets/images/card-back-alternate.png"
-    alternate_img = Image.open(alternate_back_path)
+def draw_talons_back(img, xt, yt, scale, card_width, card_height):
+    """paste the talons back onto the card whose top-left corner is (xt, yt)
 
-    if alternate_img.mode != 'RGBA':
-        alternate_img = alternate_img.convert('RGBA')
+    Its cream corners still reach the blank's anti-aliased curves after
+    the trim, so it only covers pixels the blank has fully opaque.
+    """
+    talons_img, talons_mask, trimPx = trimmed_back(TALONS_BACK_PATH, scale)
+    box = (xt + trimPx, yt + trimPx, xt + trimPx + talons_img.width, yt + trimPx + talons_img.height)
+    opaque = img.crop(box).getchannel("A").point(lambda a: 255 if a == 255 else 0)
+    img.paste(talons_img, box[:2], ImageChops.multiply(talons_mask, opaque))
 
-    # trim pixels from all sides of in-memory back image
-    # to avoid obscuring the blank's edge lines/curves
-    trimPx = 3
-    width, height = alternate_img.size
-    alternate_img = alternate_img.crop((trimPx, trimPx, width - trimPx, height - trimPx))
 
-    card_position = 55
-    row = card_position // cards_across
-    col = card_position % cards_across
-    
-    xt = card_spacing + col * (card_width + card_spacing)
-    yt = card_spacing + row * (card_height + card_spacing)
+def add_talons_back(img, scale, card_width, card_height, card_spacing):
+    xt, yt = frame_origin(TALONS_FRAME, card_width, card_height, card_spacing)
+    draw_talons_back(img, xt, yt, scale, card_width, card_height)
 
-    paste_x = xt + trimPx
-    paste_y = yt + trimPx    
-    # if alternate_img.size != (card_width, card_height):
-    #     alternate_img = alternate_img.resize((card_width, card_height), Image.Resampling.LANCZOS)
-    
-    # if alternate_img.mode == 'RGBA':
-    img.paste(alternate_img, (xt + trimPx, yt + trimPx), alternate_img.split()[3])
-    # else:
-    #     img.paste(alternate_img, (xt, yt))
+
+def add_alternate_back(img, scale, card_width, card_height, card_spacing):
+    xt, yt = frame_origin(ALTERNATE_FRAME, card_width, card_height, card_spacing)
+    draw_alternate_back(img, xt, yt, scale, card_width, card_height)
+
+
+@lru_cache(maxsize=8)
+def load_blank(side, top, base, scale):
+    """blank sheet for a border style and scale, generated in memory once
+
+    Shared between callers, so crop or copy it before drawing.
+    """
+    return render_blank_cards(side, top, base, scale)
+
+
+def reduce_image(img, factor, quality="box"):
+    """img shrunk by an integer factor, averaged with premultiplied alpha
+
+    box uses Image.reduce, lanczos the slower, sharper resize filter.
+    """
+    if factor == 1:
+        return img
+    # premultiplied, so transparent pixels don't darken the edges they touch
+    premultiplied = img.convert("RGBa")
+    if quality == "lanczos":
+        small = premultiplied.resize((img.width // factor, img.height // factor),
+                                     Image.Resampling.LANCZOS)
+    else:
+        small = premultiplied.reduce(factor)
+    return small.convert("RGBA")
+
+
+@lru_cache(maxsize=8)
+def supersampled_blank(side, top, base, scale, supersample=1, quality="box"):
+    """load_blank, drawn supersample times larger and reduced when above 1"""
+    if supersample == 1:
+        return load_blank(side, top, base, scale)
+    return reduce_image(load_blank(side, top, base, scale * supersample), supersample, quality)
+
+
+@lru_cache(maxsize=8)
+def blank_digest(side, top, base, scale):
+    return hashlib.sha1(load_blank(side, top, base, scale).tobytes()).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def renderer_digest():
+    """one hash over the source of RENDERER_MODULES"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha1()
+    for name in RENDERER_MODULES:
+        digest.update(file_digest(os.path.join(here, name)).encode("ascii"))
+    return digest.hexdigest()
+
+
+def deck_output_path(side, top, base, scale):
+    return f"public/assets/images/cards_corner-7_side-{side}-top-{top}-base-{base}_scale-{scale}.png"
+
+
+def frame_parts(position, side, top, base, scale, supersample=1, quality="box"):
+    """what one frame's pixels depend on, used as its frame cache key"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+
+    template = supersampled_blank(side, top, base, scale, supersample, quality)
+    xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+    blank = template.crop((xt, yt, xt + card_width, yt + card_height))
+
+    parts = {
+        "renderer": renderer_digest(),
+        "scale": scale,
+        "border": f"side={side} top={top} base={base}",
+        "blank": hashlib.sha1(blank.tobytes()).hexdigest(),
+    }
+    if supersample > 1:
+        parts["supersample"] = f"{supersample} {quality}"
+    if position < 52:
+        suit_index, value_index = divmod(position, len(CARD_VALUES))
+        parts["rank"] = CARD_VALUES[value_index]
+        parts["suit"] = SUIT_LETTERS[suit_index]
+        parts["art"] = art_digest(SUIT_ART[SUIT_LETTERS[suit_index]])
+        parts["font"] = font_digest("Arial")
+    elif position == FEATHER_FRAME:
+        parts["art"] = art_digest(FEATHER_PATH)
+    elif position == ALTERNATE_FRAME:
+        parts["art"] = art_digest(ALTERNATE_BACK_PATH)
+    elif position == TALONS_FRAME:
+        parts["art"] = art_digest(TALONS_BACK_PATH)
+    return parts
+
+
+def draw_frame(tile, position, scale):
+    """draw frame position's face or back onto a card-sized blank tile"""
+    card_width, card_height, _ = card_geometry(scale)
+    if position < 52:
+        suit_index, value_index = divmod(position, len(CARD_VALUES))
+        draw_card_face(tile, ImageDraw.Draw(tile), 0, 0, CARD_VALUES[value_index], suit_index,
+                       scale, card_width, card_height)
+    elif position == FEATHER_FRAME:
+        draw_feather_back(tile, 0, 0, scale, card_width, card_height)
+    elif position == ALTERNATE_FRAME:
+        draw_alternate_back(tile, 0, 0, scale, card_width, card_height)
+    elif position == TALONS_FRAME:
+        draw_talons_back(tile, 0, 0, scale, card_width, card_height)
+    return tile
+
+
+def render_frame(position, side, top, base, scale, supersample=1, quality="box"):
+    """one frame drawn on its own card-sized tile cut from the blank sheet
+
+    With supersample above 1 the blank and glyphs are drawn that many times
+    larger and reduced; pixel art is pasted after the reduction so it is
+    never filtered.
+    """
+    card_width, card_height, card_spacing = card_geometry(scale)
+
+    template = supersampled_blank(side, top, base, scale, supersample, quality)
+    xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+    tile = template.crop((xt, yt, xt + card_width, yt + card_height))
+    if position >= 52 or supersample == 1:
+        return draw_frame(tile, position, scale)
+
+    # glyphs drawn large on their own layer and reduced, then laid over the
+    # art as in draw_card_face, so the art stays on the bottom
+    suit_index, value_index = divmod(position, len(CARD_VALUES))
+    big_width, big_height, _ = card_geometry(scale * supersample)
+    glyphs = Image.new("RGBA", (big_width, big_height), (0, 0, 0, 0))
+    draw_card_face(glyphs, ImageDraw.Draw(glyphs), 0, 0, CARD_VALUES[value_index], suit_index,
+                   scale * supersample, big_width, big_height, art=False)
+    paste_card_art(tile, 0, 0, suit_index, scale, card_width, card_height)
+    tile.alpha_composite(reduce_image(glyphs, supersample, quality))
+    return tile
+
+
+def render_deck(side, top, base, scale, verbose=False, supersample=1, quality="box",
+                use_cache=True):
+    """assemble the sheet from per-frame tiles, rendering only uncached ones
+
+    use_cache=False draws every frame fresh, for checks that must not
+    trust earlier tiles.
+    """
+    card_width, card_height, card_spacing = card_geometry(scale)
+
+    # blank generated once per process, each render works on its own copy
+    img = supersampled_blank(side, top, base, scale, supersample, quality).copy()
+
+    if verbose:
+        print('Drawing card faces and backs (frames 54-56)...')
+    for position in range(FRAME_COUNT):
+        render = lambda: render_frame(position, side, top, base, scale, supersample, quality)
+        if use_cache:
+            tile = cached_frame(frame_parts(position, side, top, base, scale, supersample, quality),
+                                render)
+        else:
+            tile = render()
+        img.paste(tile, frame_origin(position, card_width, card_height, card_spacing))
+
+    if verbose:
+        report_frame_renders()
+    return img
+
+
+def deck_inputs(side, top, base, scale, supersample=1, quality="box"):
+    """everything a rendered sheet depends on, as name -> digest/value"""
+    inputs = {
+        "params": f"side={side} top={top} base={base} scale={scale}",
+        "renderer": renderer_digest(),
+        "blank": blank_digest(side, top, base, scale),
+    }
+    if supersample > 1:
+        inputs["supersample"] = f"{supersample} {quality}"
+    for path in list(SUIT_ART.values()) + [FEATHER_PATH, ALTERNATE_BACK_PATH, TALONS_BACK_PATH]:
+        inputs[f"art {os.path.basename(path)}"] = file_digest(path)
+    inputs["font Arial"] = font_digest("Arial")
+    return inputs
+
+
+def build_deck(side, top, base, scale, supersample=1, quality="box"):
+    output_path = deck_output_path(side, top, base, scale)
+
+    with stage("inputs"):
+        inputs = deck_inputs(side, top, base, scale, supersample, quality)
+    with stage("check build"):
+        reason = check_build(output_path, inputs)
+    if reason is None:
+        print(f'Up to date: {output_path}')
+        return
+    print(f'Rebuilding because {reason}')
+
+    with stage("archive"):
+        # linked aside at once, copied into the archive while the deck renders
+        archive_file(output_path, "cards", {"side": side, "top": top, "base": base, "scale": scale})
+
+    with stage("restore cached"):
+        restored = restore_cached(output_path, inputs)
+    if restored:
+        print(f'\nRestored identical earlier build to: {output_path}')
+    else:
+        with stage("render"):
+            img = render_deck(side, top, base, scale, verbose=True,
+                              supersample=supersample, quality=quality)
+        with stage("save"):
+            atomic_save(img, output_path)
+        print(f'\nGenerated deck saved to: {output_path}')
+    with stage("record build"):
+        record_build(output_path, inputs)
 
 
 def generate_deck():
-    side, top, base, scale = get_parameters()
-    
-    card_width = 56 * scale
-    card_height = 78 * scale
-    card_spacing = 1 * scale
-    
-    input_filename = f"cards_blank_56x78_corner-7_side-{side}-top-{top}-base-{base}_scale-{scale}.png"
-    input_path = f"dev/art/{input_filename}"
-    
-    output_filename = f"cards_corner-7_side-{side}-top-{top}-base-{base}_scale-{scale}.png"
-    output_path = f"public/assets/images/{output_filename}"
-    
-    if not os.path.exists(input_path):
-        print(f'Error: blank template not found: {input_path}')
-        sys.exit(1)
-    
-    print(f'Loading blank template: {input_filename}')
-    print(f'Parameters: side={side}, top={top}, base={base}, scale={scale}')
-    
+    side, top, base, scale, supersample, quality, profile = get_parameters()
+
+    print(f'Parameters: side={side}, top={top}, base={base}, scale={scale}'
+          + (f', supersample={supersample} {quality}' if supersample > 1 else ''))
+
+    if profile:
+        start_profile()
     try:
-        img = Image.open(input_path)
-        draw = ImageDraw.Draw(img)
-        
-        print('Drawing card faces...')
-        card_count = draw_card_faces(img, draw, scale, card_width, card_height, card_spacing)
-        print(f'Created {card_count} card faces')
-        
-        print('Adding feather back design (frame 56)...')
-        add_feather_back(img, scale, card_width, card_height, card_spacing)
-        
-        print('Adding alternate back design (frame 55)...')
-        add_alternate_back(img, scale, card_width, card_height, card_spacing)
-        
-        if os.path.exists(output_path):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-            backup_path = f"dev/art/archive/cards_{timestamp}.png"
-            os.makedirs("dev/art/archive", exist_ok=True)
-            shutil.copy2(output_path, backup_path)
-            print(f'Backed up existing file to: {backup_path}')
-        
-        img.save(output_path)
-        print(f'\nGenerated deck saved to: {output_path}')
-        
+        with profile_dump(profile if isinstance(profile, str) else None):
+            build_deck(side, top, base, scale, supersample, quality)
+        report_font_loads()
+        report_art_loads()
+
     except FileNotFoundError as e:
         print(f'Error: required image file not found: {e}')
         sys.exit(1)
     except Exception as e:
         print(f'Error: {e}')
         sys.exit(1)
+    finally:
+        if profile:
+            stop_profile()
+            report_profile()
 
 
 if __name__ == "__main__":
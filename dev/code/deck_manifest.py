@@ -0,0 +1,141 @@
+from PIL import Image
+import argparse
+import glob
+import hashlib
+import os
+import sys
+
+from deck_maker import (FRAME_COUNT, TALONS_FRAME, ALTERNATE_FRAME, FEATHER_FRAME, card_geometry,
+                        deck_output_path, add_variant_arguments, check_variant_arguments)
+from atlas_packer import split_sheet, pack_atlas
+from sheet_encoder import encode_sheet
+from sheet_io import atomic_write_bytes, atomic_write_json
+
+# the game is served from public/, so manifest paths are relative to it
+PUBLIC_DIR = "public"
+ATLAS_DIR = "assets/images"
+# read by preload-scene.ts; the only file here that is not content-hashed
+MANIFEST_PATH = os.path.join(PUBLIC_DIR, ATLAS_DIR, "cards-manifest.json")
+
+# faces change with borders and fonts, backs with back art: keep them apart
+ATLAS_FRAMES = {
+    "faces": range(0, 52),
+    "backs": range(52, FRAME_COUNT),
+}
+HASH_LENGTH = 10
+# CARD_BACK_OPTIONS in src/scenes/common.ts: backs the player can pick, so
+# each must be its own art
+BACK_OPTION_FRAMES = {TALONS_FRAME: "talons", ALTERNATE_FRAME: "birds", FEATHER_FRAME: "feathers"}
+
+
+def atlas_stem(name, side, top, base, scale):
+    return f"cards-{name}_side-{side}-top-{top}-base-{base}_scale-{scale}"
+
+
+def hashed_name(stem, data, ext=".png"):
+    """stem.<content hash>.ext, so a changed file always gets a new URL"""
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def back_option_problems(backs_data):
+    """back options that packed onto another frame's rect, i.e. blank or a copy"""
+    rects = {int(index): tuple(entry["frame"].values())
+             for index, entry in backs_data["frames"].items()}
+    problems = []
+    for position, name in BACK_OPTION_FRAMES.items():
+        same = [other for other, rect in rects.items()
+                if other != position and rect == rects[position]]
+        if same:
+            problems.append(f"frame {position} ({name}) packs onto the same rect as frame {same[0]}")
+    return problems
+
+
+def prune_stale(stem, keep):
+    """remove earlier hashed versions of stem, now that nothing points at them"""
+    removed = []
+    for path in glob.glob(os.path.join(PUBLIC_DIR, ATLAS_DIR, glob.escape(stem) + ".*.png")):
+        if os.path.basename(path) != keep:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def publish_atlases(deck, side, top, base, scale):
+    """write the faces and backs atlases under hashed names; returns the manifest
+
+    Each manifest entry holds the path the game loads, the byte size and
+    the Phaser JSON-hash frame map, named by sheet index. An atlas whose
+    bytes are unchanged keeps its name, so browsers keep their cached copy.
+    Nothing is written if a back option is blank or a copy (ValueError).
+    Earlier versions are left in place; prune_published removes them once
+    the manifest pointing past them is saved.
+    """
+    frames = split_sheet(deck, *card_geometry(scale), FRAME_COUNT)
+    packed = {}
+    for name, positions in ATLAS_FRAMES.items():
+        stem = atlas_stem(name, side, top, base, scale)
+        packed[name] = pack_atlas([frames[p] for p in positions], stem + ".png",
+                                  first_frame=positions[0])
+    problems = back_option_problems(packed["backs"][1])
+    if problems:
+        raise ValueError("not publishing, the game offers every back option: "
+                         + "; ".join(problems))
+
+    manifest = {}
+    for name, (atlas, data) in packed.items():
+        stem = atlas_stem(name, side, top, base, scale)
+        png, _, _ = encode_sheet(atlas)
+        filename = hashed_name(stem, png)
+        path = os.path.join(PUBLIC_DIR, ATLAS_DIR, filename)
+        if not os.path.exists(path):
+            atomic_write_bytes(png, path)
+
+        manifest[name] = {
+            "path": f"{ATLAS_DIR}/{filename}",
+            "bytes": len(png),
+            "size": data["meta"]["size"],
+            "frames": data["frames"],
+        }
+    return manifest
+
+
+def prune_published(manifest, side, top, base, scale):
+    """remove atlases the saved manifest no longer points at; returns their paths"""
+    removed = []
+    for name, entry in manifest.items():
+        removed += prune_stale(atlas_stem(name, side, top, base, scale),
+                               os.path.basename(entry["path"]))
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Split a deck sheet into content-hashed faces and backs atlases plus a manifest')
+    add_variant_arguments(parser)
+    parser.add_argument('--sheet', help='deck sheet to split (default: the built deck for these options)')
+    args = parser.parse_args()
+
+    check_variant_arguments(args)
+    sheet_path = args.sheet or deck_output_path(args.side, args.top, args.base, args.scale)
+    if not os.path.exists(sheet_path):
+        print(f'Error: sheet not found: {sheet_path} (build it with deck_maker.py first)')
+        sys.exit(1)
+
+    with Image.open(sheet_path) as source:
+        deck = source.convert("RGBA")
+    try:
+        manifest = publish_atlases(deck, args.side, args.top, args.base, args.scale)
+    except ValueError as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+    atomic_write_json(manifest, MANIFEST_PATH)
+    prune_published(manifest, args.side, args.top, args.base, args.scale)
+
+    for name, entry in manifest.items():
+        print(f"✓ {name}: {entry['path']} ({entry['bytes'] / 1024:.1f} KB, "
+              f"{len(entry['frames'])} frames)")
+    print(f"✓ manifest saved to: {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+from PIL import Image, ImageDraw, ImageFont
+from collections import Counter
+from contextlib import contextmanager
+import cProfile
+import functools
+import os
+import sys
+import time
+import tracemalloc
+
+# (owner, attribute, label) of the Pillow calls worth counting
+PRIMITIVES = [
+    (ImageFont, "truetype", "ImageFont.truetype"),
+    (Image, "open", "Image.open"),
+    (Image.Image, "paste", "Image.paste"),
+    (ImageDraw.ImageDraw, "textbbox", "draw.textbbox"),
+    (ImageDraw.ImageDraw, "text", "draw.text"),
+]
+
+_active = False
+_stages = []
+_calls = Counter()
+_originals = []
+# stage bookkeeping is kept out of the cProfile / collapsed stack dumps
+_quiet = False
+_cprofile = None
+
+
+def _counting(label, func):
+    @functools.wraps(func)
+    def counted(*args, **kwargs):
+        _calls[label] += 1
+        return func(*args, **kwargs)
+    return counted
+
+
+def start_profile():
+    """start counting primitive calls and tracing allocations"""
+    global _active
+    if _active:
+        return
+    for owner, attribute, label in PRIMITIVES:
+        original = getattr(owner, attribute)
+        _originals.append((owner, attribute, original))
+        setattr(owner, attribute, _counting(label, original))
+    tracemalloc.start()
+    _stages.clear()
+    _calls.clear()
+    _active = True
+
+
+def stop_profile():
+    global _active
+    while _originals:
+        owner, attribute, original = _originals.pop()
+        setattr(owner, attribute, original)
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _active = False
+
+
+@contextmanager
+def _unprofiled():
+    global _quiet
+    if _cprofile is not None:
+        _cprofile.disable()
+    _quiet = True
+    try:
+        yield
+    finally:
+        _quiet = False
+        if _cprofile is not None:
+            _cprofile.enable()
+
+
+@contextmanager
+def stage(name):
+    """time a stage and record its allocations; does nothing unless profiling"""
+    if not _active:
+        yield
+        return
+    with _unprofiled():
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        calls_before = Counter(_calls)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _unprofiled():
+            _record_stage(name, elapsed, before, calls_before)
+
+
+def _record_stage(name, elapsed, before, calls_before):
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__)]
+    growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    _stages.append({
+        "name": name,
+        "seconds": elapsed,
+        "net_kb": sum(stat.size_diff for stat in growth) / 1024,
+        "peak_kb": peak / 1024,
+        "calls": _calls - calls_before,
+        "top": [stat for stat in growth[:3] if stat.size_diff >= 1024],
+    })
+
+
+def report_profile():
+    if not _stages:
+        return
+    labels = [label for _, _, label in PRIMITIVES]
+    short = [label.split(".")[-1] for label in labels]
+    width = max(len(s["name"]) for s in _stages + [{"name": "stage"}])
+    print(f"\nProfile:\n  {'stage':<{width}} {'ms':>9} {'net KB':>9} {'peak KB':>9} "
+          + " ".join(f"{s:>8}" for s in short))
+    for s in _stages:
+        print(f"  {s['name']:<{width}} {s['seconds'] * 1000:>9.1f} {s['net_kb']:>9.0f} "
+              f"{s['peak_kb']:>9.0f} " + " ".join(f"{s['calls'][label]:>8}" for label in labels))
+    print("  calls in total: " + ", ".join(f"{label} {_calls[label]}" for label in labels))
+
+    print("\n  largest allocations still held after each stage:")
+    for s in _stages:
+        for stat in s["top"]:
+            frame = stat.traceback[0]
+            print(f"    {s['name']}: {stat.size_diff / 1024:.0f} KB "
+                  f"at {os.path.basename(frame.filename)}:{frame.lineno}")
+
+
+def _frame_label(frame):
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _c_label(func):
+    return getattr(func, "__qualname__", None) or repr(func)
+
+
+@contextmanager
+def collapsed_stacks(output_path):
+    """trace this thread with sys.setprofile and write flamegraph collapsed stacks
+
+    Time between two profile events is charged to the stack that was
+    running, in microseconds, so the file feeds flamegraph.pl or
+    speedscope directly.
+    """
+    totals = Counter()
+    # the stack as it stands once setprofile returns; events pop it from there
+    stack = []
+    frame = sys._getframe(0)
+    while frame is not None:
+        stack.insert(0, _frame_label(frame))
+        frame = frame.f_back
+    stack.append(_c_label(sys.setprofile))
+    last = [time.perf_counter()]
+
+    def profile(frame, event, arg):
+        if not _quiet:
+            totals[tuple(stack)] += time.perf_counter() - last[0]
+        if event == "call":
+            stack.append(_frame_label(frame))
+        elif event == "c_call":
+            stack.append(_c_label(arg))
+        elif len(stack) > 1:
+            stack.pop()
+        last[0] = time.perf_counter()
+
+    sys.setprofile(profile)
+    try:
+        yield
+    finally:
+        sys.setprofile(None)
+        with open(output_path, "w") as f:
+            for labels, seconds in sorted(totals.items()):
+                if seconds >= 1e-6:
+                    f.write(f"{';'.join(labels)} {int(seconds * 1e6)}\n")
+        print(f"Collapsed stacks written to: {output_path}")
+
+
+@contextmanager
+def profile_dump(output_path):
+    """cProfile stats for a .prof path, collapsed stacks for anything else"""
+    if output_path is None:
+        yield
+        return
+    if not output_path.endswith(".prof"):
+        with collapsed_stacks(output_path):
+            yield
+        return
+    global _cprofile
+    profiler = _cprofile = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _cprofile = None
+        profiler.dump_stats(output_path)
+        print(f"cProfile stats written to: {output_path} (view with python -m pstats or snakeviz)")
@@ -0,0 +1,202 @@
+from PIL import Image
+import argparse
+import queue
+import resource
+import struct
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from blank_deck_maker import render_blank_cards
+from build_cache import record_build
+from deck_maker import (CARDS_ACROSS, CARDS_DOWN, FRAME_COUNT, card_geometry, frame_origin,
+                        draw_frame, deck_output_path, deck_inputs, add_variant_arguments,
+                        check_variant_arguments)
+from sheet_archive import archive_file
+from sheet_io import atomic_stream
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# bands rendered ahead of the encoder; bounds memory at a few bands
+BAND_QUEUE_SIZE = 2
+IDAT_SIZE = 256 * 1024
+STREAM_SCALES = range(1, 33)
+
+
+def _chunk(f, kind, data):
+    f.write(struct.pack(">I", len(data)) + kind + data)
+    f.write(struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff))
+
+
+def png_rows(band):
+    """filtered scanlines for an RGBA band, PNG filter 1 (Sub) on every row"""
+    pixels = np.asarray(band, dtype=np.uint8).reshape(band.height, band.width * 4)
+    filtered = np.empty((band.height, band.width * 4 + 1), dtype=np.uint8)
+    filtered[:, 0] = 1
+    filtered[:, 1:5] = pixels[:, :4]
+    filtered[:, 5:] = pixels[:, 4:] - pixels[:, :-4]
+    return filtered.tobytes()
+
+
+def write_png_stream(f, width, height, bands, compress_level=6):
+    """write an 8-bit RGBA PNG from bands (RGBA images, top to bottom)
+
+    Each band is filtered, fed to one zlib stream and written out as IDAT
+    chunks, so only the band in hand is ever held uncompressed.
+    """
+    f.write(PNG_SIGNATURE)
+    _chunk(f, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+    compressor = zlib.compressobj(compress_level)
+    pending = bytearray()
+    rows = 0
+    for band in bands:
+        if band.width != width:
+            raise ValueError(f"band is {band.width}px wide, sheet is {width}px")
+        rows += band.height
+        pending += compressor.compress(png_rows(band))
+        while len(pending) >= IDAT_SIZE:
+            _chunk(f, b"IDAT", bytes(pending[:IDAT_SIZE]))
+            del pending[:IDAT_SIZE]
+    pending += compressor.flush()
+    if rows != height:
+        raise ValueError(f"bands cover {rows} rows, sheet has {height}")
+    for start in range(0, len(pending), IDAT_SIZE):
+        _chunk(f, b"IDAT", bytes(pending[start:start + IDAT_SIZE]))
+    _chunk(f, b"IEND", b"")
+
+
+def band_blanks(side, top, base, scale):
+    """(first, middle, last) blank bands, cut from a three-row blank
+
+    Every inner row of the sheet has the same blank, including the border
+    overhang it gets from the rows above and below, so three rows cover all
+    19 without generating the full sheet.
+    """
+    card_width, card_height, card_spacing = card_geometry(scale)
+    pitch = card_height + card_spacing
+    three = render_blank_cards(side, top, base, scale, cards_down=3)
+    return (three.crop((0, 0, three.width, pitch)),
+            three.crop((0, pitch, three.width, 2 * pitch)),
+            three.crop((0, 2 * pitch, three.width, three.height)))
+
+
+def render_bands(side, top, base, scale):
+    """one RGBA band per row of cards, the gutter above each row included
+
+    The last band also carries the bottom margin.
+    """
+    card_width, card_height, card_spacing = card_geometry(scale)
+    pitch = card_height + card_spacing
+    first, middle, last = band_blanks(side, top, base, scale)
+
+    for row in range(CARDS_DOWN):
+        band = (first if row == 0 else last if row == CARDS_DOWN - 1 else middle).copy()
+        for col in range(CARDS_ACROSS):
+            position = row * CARDS_ACROSS + col
+            if position >= FRAME_COUNT:
+                break
+            xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+            box = (xt, yt - row * pitch, xt + card_width, yt - row * pitch + card_height)
+            band.paste(draw_frame(band.crop(box), position, scale), box[:2])
+        yield band
+
+
+def stream_deck(side, top, base, scale, output_path, compress_level=6):
+    """render and encode band by band, the encoder on its own thread
+
+    Returns (seconds spent rendering, seconds spent encoding).
+    """
+    first, middle, last = band_blanks(side, top, base, scale)
+    width = middle.width
+    height = first.height + middle.height * (CARDS_DOWN - 2) + last.height
+
+    bands = queue.Queue(maxsize=BAND_QUEUE_SIZE)
+    failure = []
+    finished = [False]
+    encode_time = [0.0]
+
+    def queued_bands():
+        while True:
+            band = bands.get()
+            if band is None:
+                finished[0] = True
+                return
+            yield band
+
+    def encoder():
+        start = time.perf_counter()
+        try:
+            with atomic_stream(output_path) as f:
+                write_png_stream(f, width, height, queued_bands(), compress_level)
+        except BaseException as e:
+            failure.append(e)
+            # keep draining so the renderer never blocks on a dead consumer
+            while not finished[0]:
+                finished[0] = bands.get() is None
+        encode_time[0] = time.perf_counter() - start
+
+    thread = threading.Thread(target=encoder, name="png-encoder")
+    thread.start()
+    render_time = 0.0
+    try:
+        start = time.perf_counter()
+        for band in render_bands(side, top, base, scale):
+            render_time += time.perf_counter() - start
+            if failure:
+                break
+            bands.put(band)
+            start = time.perf_counter()
+    finally:
+        bands.put(None)
+        thread.join()
+    if failure:
+        raise failure[0]
+    return render_time, encode_time[0]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render a large deck one row of cards at a time, streaming into the PNG')
+    add_variant_arguments(parser, scale=8, scales=STREAM_SCALES)
+    parser.add_argument('--compress-level', type=int, default=6, help='zlib level 0-9')
+    parser.add_argument('--output', help='PNG path (default: the usual deck path, archived and recorded as deck_maker does)')
+    args = parser.parse_args()
+
+    check_variant_arguments(args, STREAM_SCALES)
+
+    deck_path = deck_output_path(args.side, args.top, args.base, args.scale)
+    output_path = args.output or deck_path
+    replaces_deck = output_path == deck_path
+    start = time.perf_counter()
+    try:
+        if replaces_deck:
+            archive_file(output_path, "cards", {"side": args.side, "top": args.top,
+                                                "base": args.base, "scale": args.scale})
+        render_time, encode_time = stream_deck(args.side, args.top, args.base, args.scale,
+                                               output_path, args.compress_level)
+        if replaces_deck:
+            # the same pixels as deck_maker's render, so it needn't rebuild over it
+            record_build(output_path, deck_inputs(args.side, args.top, args.base, args.scale))
+    except FileNotFoundError as e:
+        print(f'Error: required image file not found: {e}')
+        sys.exit(1)
+    except Exception as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+
+    with Image.open(output_path) as written:
+        size = written.size
+    print(f"Streamed {size[0]}x{size[1]}px sheet to: {output_path}")
+    print(f"  rendering {render_time * 1000:.0f} ms, encoding {encode_time * 1000:.0f} ms, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms wall, peak RSS {peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
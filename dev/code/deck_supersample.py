@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+from deck_maker import (SUPERSAMPLE_LEVELS, QUALITIES, load_blank, supersampled_blank,
+                        render_deck, deck_output_path, add_variant_arguments,
+                        check_variant_arguments)
+from glyph_stamps import glyph_stamp
+from sheet_io import atomic_save
+
+
+def supersampled_path(side, top, base, scale, supersample, quality):
+    name, ext = os.path.splitext(deck_output_path(side, top, base, scale))
+    if supersample == 1:
+        return name + ext
+    suffix = "" if quality == "box" else f"-{quality}"
+    return f"{name}_ss-{supersample}{suffix}{ext}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render the deck supersampled at each level and report the time taken')
+    add_variant_arguments(parser)
+    parser.add_argument('--levels', default="1,2,3,4",
+                        help='supersampling factors to try, from 1 2 3 4 (default: all)')
+    parser.add_argument('--quality', choices=QUALITIES, default="box",
+                        help='box uses Image.reduce, lanczos is slower and sharper')
+    parser.add_argument('--save', type=int, metavar='LEVEL',
+                        help='also save the sheet rendered at this level')
+    args = parser.parse_args()
+
+    try:
+        levels = [int(part) for part in args.levels.split(",") if part.strip()]
+    except ValueError:
+        print(f'Error: levels must be integers, got {args.levels!r}')
+        sys.exit(1)
+    if any(level not in SUPERSAMPLE_LEVELS for level in levels):
+        print(f'Error: levels must be in {SUPERSAMPLE_LEVELS}, got {args.levels!r}')
+        sys.exit(1)
+    check_variant_arguments(args)
+    if args.save is not None and args.save not in levels:
+        levels.append(args.save)
+
+    print(f"{'level':>5} {'quality':>8} {'ms':>9}")
+    for level in levels:
+        # start each level cold so the times include the big blank and glyphs
+        load_blank.cache_clear()
+        supersampled_blank.cache_clear()
+        glyph_stamp.cache_clear()
+        start = time.perf_counter()
+        # frames are keyed by level, so each level here is rendered, not reused
+        img = render_deck(args.side, args.top, args.base, args.scale,
+                          supersample=level, quality=args.quality)
+        elapsed = time.perf_counter() - start
+        print(f"{level:>4}x {args.quality if level > 1 else '-':>8} {elapsed * 1000:>9.1f}")
+
+        if level == args.save:
+            output_path = supersampled_path(args.side, args.top, args.base, args.scale,
+                                            level, args.quality)
+            atomic_save(img, output_path)
+            print(f"      saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
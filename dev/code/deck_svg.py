@@ -0,0 +1,286 @@
+import argparse
+import base64
+import hashlib
+import os
+import sys
+from xml.sax.saxutils import escape, quoteattr
+
+from deck_maker import (SUIT_ART, FEATHER_PATH, ALTERNATE_BACK_PATH, TALONS_BACK_PATH, CARD_UNITS,
+                        SPACING_UNITS, CARDS_ACROSS, CARDS_DOWN, FRAME_COUNT, ALTERNATE_FRAME,
+                        FEATHER_FRAME, TALONS_FRAME, FEATHER_LATTICE, SUIT_SYMBOL_LAYOUT,
+                        SUIT_COLOURS, CARD_VALUES, SUIT_SYMBOLS, SUIT_LETTERS, frame_origin,
+                        add_variant_arguments, check_variant_arguments)
+from art_cache import ART_SCALE, load_art
+from back_tiling import lattice_cells
+from build_cache import BUILD_CACHE_DIR
+from font_registry import get_font
+from sheet_io import atomic_stream, atomic_write_bytes
+
+# rasterized PNGs, named by the hash of the SVG they came from
+SVG_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "svg")
+
+FONT_FAMILY = "Arial, sans-serif"
+FILL_COLOUR = "rgb(255,250,240)"
+BORDER_OPACITY = round(100 / 255, 3)
+CORNER_RADIUS = 7
+
+
+def deck_svg_path(side, top, base):
+    return f"dev/art/cards_corner-7_side-{side}-top-{top}-base-{base}.svg"
+
+
+def _attrs(**attrs):
+    # trailing underscores let python keywords through, underscores become dashes
+    return "".join(f" {name.rstrip('_').replace('_', '-')}={quoteattr(str(value))}"
+                   for name, value in attrs.items() if value is not None)
+
+
+def _num(value):
+    return f"{value:g}"
+
+
+def _rgb(colour):
+    return "rgb({},{},{})".format(*colour)
+
+
+def _ascent(family="Arial"):
+    """ascender as a fraction of the font size
+
+    Pillow places text by its top (the "la" anchor), SVG by its baseline,
+    so each text element is moved down by this much.
+    """
+    size = 1000
+    ascent, _ = get_font(family, size).getmetrics()
+    return ascent / size
+
+
+def _art_symbol(symbol_id, path):
+    """the art as an embedded PNG, sized in card units"""
+    image, _ = load_art(path)
+    with open(path, "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    width, height = image.width / ART_SCALE, image.height / ART_SCALE
+    return (f"<symbol{_attrs(id=symbol_id, overflow='visible')}>"
+            f"<image{_attrs(width=_num(width), height=_num(height), href='data:image/png;base64,' + data, style='image-rendering:pixelated')}/>"
+            f"</symbol>"), (width, height)
+
+
+def _text(x, y, text, size, ascent):
+    return (f"<text{_attrs(x=_num(x), y=_num(y + size * ascent), font_size=_num(size))}>"
+            f"{escape(text)}</text>")
+
+
+def _card_symbol(side, top, base):
+    """rounded blank plus the translucent border strokes, one path per edge style"""
+    card_width, card_height = CARD_UNITS
+    r = CORNER_RADIUS
+    right, bottom = card_width, card_height
+    lines = [f"<symbol{_attrs(id='card', overflow='visible')}>",
+             f"<rect{_attrs(width=card_width, height=card_height, rx=r, fill=FILL_COLOUR)}/>"]
+    edges = [
+        (top, f"M0 {r}A{r} {r} 0 0 1 {r} 0H{right - r}A{r} {r} 0 0 1 {right} {r}"),
+        (side, f"M0 {r}V{bottom - r}M{right} {r}V{bottom - r}"),
+        (base, f"M0 {bottom - r}A{r} {r} 0 0 0 {r} {bottom}H{right - r}"
+               f"A{r} {r} 0 0 0 {right} {bottom - r}"),
+    ]
+    for width, d in edges:
+        if width:
+            lines.append(f"<path{_attrs(d=d, fill='none', stroke='black', stroke_width=width, stroke_opacity=_num(BORDER_OPACITY))}/>")
+    lines.append("</symbol>")
+    return lines
+
+
+def _rank_symbols(ascent):
+    """the top-left ranks; colour comes from the fill on each use"""
+    small = 30
+    lines = []
+    for value in CARD_VALUES:
+        lines.append(f"<symbol{_attrs(id='rank-' + value, overflow='visible')}>")
+        if value == '10':
+            lines.append(f"<rect{_attrs(x=7, y=5, width=2, height=19)}/>")
+            lines.append(_text(11, -2, '0', small, ascent))
+        elif value == 'Q':
+            lines.append(_text(4, -2, value, small, ascent))
+        else:
+            lines.append(_text(6, -2, value, small, ascent))
+        lines.append("</symbol>")
+    return lines
+
+
+def _suit_symbols(ascent):
+    """suit glyphs at draw_card_face's per-suit size and indents"""
+    card_width = CARD_UNITS[0]
+    lines = []
+    for symbol, letter in zip(SUIT_SYMBOLS, SUIT_LETTERS):
+        size, top, right = SUIT_SYMBOL_LAYOUT[letter]
+        lines.append(f"<symbol{_attrs(id='suit-' + letter, overflow='visible')}>"
+                     + _text(card_width - right, top, symbol, size, ascent)
+                     + "</symbol>")
+    return lines
+
+
+def _feather_back(feather_size):
+    """draw_feather_back's FEATHER_LATTICE, centred the same way"""
+    card_width, card_height = CARD_UNITS
+    tile_width, tile_height = feather_size
+    start_x = card_width / 2 - FEATHER_LATTICE.across * tile_width / 2
+    start_y = card_height / 2 - FEATHER_LATTICE.down * tile_height / 2
+    lines = [f"<symbol{_attrs(id='feather-back', overflow='visible')}>"]
+    for x, y, flip_x, _ in lattice_cells(FEATHER_LATTICE, tile_width, tile_height):
+        x, y = start_x + x, start_y + y
+        if flip_x:
+            transform = f"translate({_num(x + tile_width)} {_num(y)}) scale(-1 1)"
+        else:
+            transform = f"translate({_num(x)} {_num(y)})"
+        lines.append(f"<use{_attrs(href='#feather', transform=transform)}/>")
+    lines.append("</symbol>")
+    return lines
+
+
+def _trimmed_back(symbol_id, art_id, back_size):
+    """a full-card back trimmed 1.5 units all round, like deck_maker.trimmed_back
+
+    Returns the symbol and the (x, y, width, height) it is placed at. The
+    talons back's cut-out of the blank's anti-aliased corners is left to
+    the raster sheet.
+    """
+    trim = 1.5
+    box = (trim, trim, back_size[0] - 2 * trim, back_size[1] - 2 * trim)
+    return (f"<symbol{_attrs(id=symbol_id, viewBox=' '.join(map(_num, box)))}>"
+            f"<use{_attrs(href='#' + art_id)}/></symbol>"), box
+
+
+def svg_lines(side, top, base):
+    """the deck document, a line at a time, in card units
+
+    Every shared part (blank card, ranks, suit glyphs, art, backs) is a
+    <symbol> defined once; each frame is a group of <use> references.
+    Positions follow the raster sheet, so the document lines up with the
+    PNG at any scale, but text and strokes are left to the SVG renderer and
+    will not match Pillow's pixels exactly.
+    """
+    card_width, card_height = CARD_UNITS
+    width = CARDS_ACROSS * card_width + (CARDS_ACROSS + 1) * SPACING_UNITS
+    height = CARDS_DOWN * card_height + (CARDS_DOWN + 1) * SPACING_UNITS
+    ascent = _ascent()
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield (f"<svg{_attrs(xmlns='http://www.w3.org/2000/svg', width=width, height=height, viewBox=f'0 0 {width} {height}')}"
+           f"{_attrs(font_family=FONT_FAMILY)}>")
+    yield "<defs>"
+    yield from _card_symbol(side, top, base)
+    yield from _rank_symbols(ascent)
+    yield from _suit_symbols(ascent)
+
+    art_sizes = {}
+    for letter in SUIT_LETTERS:
+        symbol, art_sizes[letter] = _art_symbol("art-" + letter, SUIT_ART[letter])
+        yield symbol
+    symbol, feather_size = _art_symbol("feather", FEATHER_PATH)
+    yield symbol
+    yield from _feather_back(feather_size)
+    symbol, back_size = _art_symbol("alternate-art", ALTERNATE_BACK_PATH)
+    yield symbol
+    symbol, back_box = _trimmed_back("alternate-back", "alternate-art", back_size)
+    yield symbol
+    symbol, talons_size = _art_symbol("talons-art", TALONS_BACK_PATH)
+    yield symbol
+    symbol, talons_box = _trimmed_back("talons-back", "talons-art", talons_size)
+    yield symbol
+    yield "</defs>"
+
+    for position in range(FRAME_COUNT):
+        xt, yt = frame_origin(position, card_width, card_height, SPACING_UNITS)
+        uses = [f"<use{_attrs(href='#card')}/>"]
+        colour = None
+        if position < 52:
+            suit_index, value_index = divmod(position, len(CARD_VALUES))
+            letter = SUIT_LETTERS[suit_index]
+            colour = _rgb(SUIT_COLOURS[suit_index])
+            art_width, art_height = art_sizes[letter]
+            art_x = card_width / 2 - art_width / 2
+            art_y = card_height / 2 - art_height / 2 + 12
+            uses += [f"<use{_attrs(href='#art-' + letter, x=_num(art_x), y=_num(art_y))}/>",
+                     f"<use{_attrs(href='#rank-' + CARD_VALUES[value_index])}/>",
+                     f"<use{_attrs(href='#suit-' + letter)}/>"]
+        elif position == FEATHER_FRAME:
+            uses.append(f"<use{_attrs(href='#feather-back')}/>")
+        elif position == ALTERNATE_FRAME:
+            x, y, back_width, back_height = map(_num, back_box)
+            uses.append(f"<use{_attrs(href='#alternate-back', x=x, y=y, width=back_width, height=back_height)}/>")
+        elif position == TALONS_FRAME:
+            x, y, back_width, back_height = map(_num, talons_box)
+            uses.append(f"<use{_attrs(href='#talons-back', x=x, y=y, width=back_width, height=back_height)}/>")
+        yield (f"<g{_attrs(id=f'frame-{position}', transform=f'translate({xt} {yt})', fill=colour)}>"
+               + "".join(uses) + "</g>")
+    yield "</svg>"
+
+
+def write_deck_svg(side, top, base, output_path=None):
+    """stream the deck document to output_path; returns (path, sha256 of the bytes)"""
+    output_path = output_path or deck_svg_path(side, top, base)
+    digest = hashlib.sha256()
+    with atomic_stream(output_path) as f:
+        for line in svg_lines(side, top, base):
+            data = (line + "\n").encode("utf-8")
+            digest.update(data)
+            f.write(data)
+    return output_path, digest.hexdigest()
+
+
+def rasterize(svg_path, digest, scale):
+    """PNG of the document at scale (pixels per card unit), or None without cairosvg
+
+    Results are kept under SVG_CACHE_DIR by document hash and scale, so an
+    unchanged document is only rendered once per scale.
+    """
+    cached = os.path.join(SVG_CACHE_DIR, f"{digest}_scale-{scale}.png")
+    if os.path.exists(cached):
+        return cached
+    try:
+        import cairosvg
+    except ImportError:
+        print("cairosvg not installed, skipping rasterization (pip install cairosvg)")
+        return None
+    png = cairosvg.svg2png(url=svg_path, scale=scale)
+    atomic_write_bytes(png, cached)
+    return cached
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write the whole deck as one SVG built from reusable symbols')
+    add_variant_arguments(parser, scale=None)
+    parser.add_argument('--output', help='SVG path (default: under dev/art)')
+    parser.add_argument('--rasterize', metavar='SCALES',
+                        help='also render PNGs at these scales, e.g. 2,4 (needs cairosvg)')
+    args = parser.parse_args()
+
+    check_variant_arguments(args)
+    try:
+        scales = [int(part) for part in (args.rasterize or "").split(",") if part.strip()]
+    except ValueError:
+        print(f'Error: scales must be integers, got {args.rasterize!r}')
+        sys.exit(1)
+
+    try:
+        svg_path, digest = write_deck_svg(args.side, args.top, args.base, args.output)
+    except FileNotFoundError as e:
+        print(f'Error: required image file not found: {e}')
+        sys.exit(1)
+    print(f"Deck SVG saved to: {svg_path} ({os.path.getsize(svg_path) / 1024:.1f} KB, "
+          f"sha256 {digest[:12]})")
+
+    name, _ = os.path.splitext(svg_path)
+    for scale in scales:
+        cached = rasterize(svg_path, digest, scale)
+        if cached is None:
+            break
+        png_path = f"{name}_scale-{scale}.png"
+        with open(cached, "rb") as f:
+            atomic_write_bytes(f.read(), png_path)
+        print(f"  scale {scale}: {png_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import os
+import sys
+import time
+
+from deck_maker import (SUIT_ART, SUIT_LETTERS, CARD_VALUES, FEATHER_PATH, ALTERNATE_BACK_PATH,
+                        TALONS_BACK_PATH, FEATHER_FRAME, ALTERNATE_FRAME, TALONS_FRAME, card_geometry,
+                        frame_origin, frame_parts, render_frame, render_deck, deck_output_path,
+                        deck_inputs, add_variant_arguments, check_variant_arguments)
+from frame_cache import cached_frame, frame_key
+from build_cache import record_build
+from sheet_io import atomic_save
+
+# fast zlib level while iterating; a normal build re-encodes properly
+WATCH_COMPRESS_LEVEL = 1
+
+
+def watched_inputs():
+    """input file -> the frames drawn from it
+
+    Blanks are generated in memory from the border parameters, so the art
+    files are the only inputs an artist edits.
+    """
+    inputs = {}
+    for suit_index, letter in enumerate(SUIT_LETTERS):
+        first = suit_index * len(CARD_VALUES)
+        inputs[SUIT_ART[letter]] = list(range(first, first + len(CARD_VALUES)))
+    inputs[FEATHER_PATH] = [FEATHER_FRAME]
+    inputs[ALTERNATE_BACK_PATH] = [ALTERNATE_FRAME]
+    inputs[TALONS_BACK_PATH] = [TALONS_FRAME]
+    return inputs
+
+
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def refresh_frames(sheet, frames, keys, side, top, base, scale):
+    """re-render frames whose cache key changed; returns the ones pasted"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+    pasted = []
+    for position in frames:
+        parts = frame_parts(position, side, top, base, scale)
+        key = frame_key(parts)
+        if keys.get(position) == key:
+            continue
+        tile = cached_frame(parts, lambda: render_frame(position, side, top, base, scale))
+        sheet.paste(tile, frame_origin(position, card_width, card_height, card_spacing))
+        keys[position] = key
+        pasted.append(position)
+    return pasted
+
+
+def save_sheet(sheet, output_path, side, top, base, scale):
+    atomic_save(sheet, output_path, compress_level=WATCH_COMPRESS_LEVEL)
+    # keep the build cache in step, so deck_maker doesn't see a stray edit
+    record_build(output_path, deck_inputs(side, top, base, scale))
+
+
+def watch(side, top, base, scale, interval):
+    output_path = deck_output_path(side, top, base, scale)
+    inputs = watched_inputs()
+
+    sheet = render_deck(side, top, base, scale)
+    keys = {position: frame_key(frame_parts(position, side, top, base, scale))
+            for frames in inputs.values() for position in frames}
+    save_sheet(sheet, output_path, side, top, base, scale)
+    stamps = {path: file_stamp(path) for path in inputs}
+    print(f"Watching {len(inputs)} art files for {output_path} (Ctrl-C to stop)")
+
+    while True:
+        time.sleep(interval)
+        changed = [path for path in inputs if file_stamp(path) != stamps[path]]
+        if not changed:
+            continue
+
+        start = time.perf_counter()
+        frames = sorted({position for path in changed for position in inputs[path]})
+        try:
+            pasted = refresh_frames(sheet, frames, keys, side, top, base, scale)
+        except (OSError, SyntaxError) as e:
+            # editors write in steps; a half-written PNG is read again next poll
+            print(f"Skipping for now, could not read art: {e}")
+            continue
+        for path in changed:
+            stamps[path] = file_stamp(path)
+
+        names = ", ".join(os.path.basename(path) for path in changed)
+        if not pasted:
+            print(f"{names}: touched, content unchanged")
+            continue
+        rendered = time.perf_counter() - start
+        save_sheet(sheet, output_path, side, top, base, scale)
+        print(f"{names}: {len(pasted)} frames re-rendered in {rendered * 1000:.0f} ms, "
+              f"sheet written in {(time.perf_counter() - start) * 1000:.0f} ms total")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rebuild only the frames affected when deck art changes')
+    add_variant_arguments(parser)
+    parser.add_argument('--interval', type=float, default=0.2, help='seconds between polls')
+    args = parser.parse_args()
+
+    check_variant_arguments(args)
+
+    try:
+        watch(args.side, args.top, args.base, args.scale, args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    except FileNotFoundError as e:
+        print(f'Error: required image file not found: {e}')
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
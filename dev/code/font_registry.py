@@ -0,0 +1,146 @@
+from PIL import ImageFont
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+# fonts checked into the repo win over anything installed on the host
+BUNDLED_FONT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "art", "fonts"))
+
+# extra directories can be given in TALON_FONT_DIRS (os.pathsep separated)
+FONT_DIRS_ENV = "TALON_FONT_DIRS"
+
+# file names tried for each family, in order; later entries are
+# metric-compatible stand-ins for hosts without the Apple originals
+FONT_FAMILIES = {
+    "Arial": ["Arial.ttf", "arial.ttf", "LiberationSans-Regular.ttf",
+              "Arimo-Regular.ttf", "DejaVuSans.ttf"],
+    "Verdana": ["Verdana.ttf", "verdana.ttf", "DejaVuSans.ttf"],
+    "Helvetica": ["Helvetica.ttc", "LiberationSans-Regular.ttf", "DejaVuSans.ttf"],
+    "Apple Symbols": ["Apple Symbols.ttf", "DejaVuSans.ttf", "Symbola.ttf"],
+}
+
+FONT_CACHE_SIZE = 32
+
+# set by pin_font: one file every family resolves to
+_pinned_font = None
+
+_font_cache = OrderedDict()
+_font_stats = {"loads": 0, "hits": 0, "seconds": 0.0, "per_font": {}}
+
+
+def system_font_dirs():
+    """font directories for this platform, most specific first"""
+    home = os.path.expanduser("~")
+    if sys.platform == "darwin":
+        return ["/System/Library/Fonts", "/System/Library/Fonts/Supplemental",
+                "/Library/Fonts", os.path.join(home, "Library/Fonts")]
+    if sys.platform.startswith("win"):
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        return [os.path.join(windir, "Fonts"),
+                os.path.join(home, r"AppData\Local\Microsoft\Windows\Fonts")]
+    return ["/usr/share/fonts", "/usr/local/share/fonts",
+            os.path.join(home, ".local/share/fonts"), os.path.join(home, ".fonts")]
+
+
+def font_search_dirs():
+    extra = [d for d in os.environ.get(FONT_DIRS_ENV, "").split(os.pathsep) if d]
+    return extra + [BUNDLED_FONT_DIR] + system_font_dirs()
+
+
+@lru_cache(maxsize=None)
+def _font_index(directory):
+    # file name -> path for every font under directory, first hit wins
+    index = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            index.setdefault(name, os.path.join(root, name))
+    return index
+
+
+def pin_font(path):
+    """resolve every family to the font file at path from now on
+
+    For checks that must render the same pixels on any host; call it
+    before anything is drawn, glyph stamps are cached by family.
+    """
+    global _pinned_font
+    _pinned_font = path
+    resolve_font.cache_clear()
+    font_digest.cache_clear()
+    _font_cache.clear()
+
+
+@lru_cache(maxsize=None)
+def resolve_font(family):
+    """path of the best available font file for family, or None"""
+    if _pinned_font is not None:
+        return _pinned_font
+    candidates = FONT_FAMILIES.get(family, [family])
+    for position, filename in enumerate(candidates):
+        for directory in font_search_dirs():
+            path = _font_index(directory).get(filename)
+            if path:
+                if position > 0 and filename.lower() != candidates[0].lower():
+                    print(f"Warning: font {family} not found, using {path}")
+                return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def font_digest(family):
+    """content hash of the font file family resolves to"""
+    path = resolve_font(family)
+    if path is None:
+        return "pillow-default"
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def get_font(family, size):
+    """loaded font for (family, size), parsed once per process"""
+    key = (family, size)
+    font = _font_cache.get(key)
+    if font is not None:
+        _font_cache.move_to_end(key)
+        _font_stats["hits"] += 1
+        return font
+
+    path = resolve_font(family)
+    start = time.perf_counter()
+    if path is None:
+        print(f"Warning: no font file for {family}, using Pillow default")
+        font = ImageFont.load_default(size)
+    else:
+        font = ImageFont.truetype(path, size)
+    elapsed = time.perf_counter() - start
+
+    _font_stats["loads"] += 1
+    _font_stats["seconds"] += elapsed
+    _font_stats["per_font"][key] = _font_stats["per_font"].get(key, 0) + 1
+
+    _font_cache[key] = font
+    if len(_font_cache) > FONT_CACHE_SIZE:
+        _font_cache.popitem(last=False)
+    return font
+
+
+def font_load_stats():
+    return {
+        "loads": _font_stats["loads"],
+        "hits": _font_stats["hits"],
+        "seconds": _font_stats["seconds"],
+        "per_font": dict(_font_stats["per_font"]),
+    }
+
+
+def report_font_loads():
+    stats = font_load_stats()
+    print(f'Fonts: {stats["loads"]} loads, {stats["hits"]} cache hits, '
+          f'{stats["seconds"] * 1000:.1f} ms parsing')
+    for (family, size), count in sorted(stats["per_font"].items()):
+        note = "" if count == 1 else "  (parsed more than once, cache too small?)"
+        print(f"  {family} {size}px: {count}{note}")
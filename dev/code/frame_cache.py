@@ -0,0 +1,51 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+# enough for a few variants' worth of tiles before the oldest are dropped
+FRAME_CACHE_SIZE = 4 * 57
+
+_tiles = OrderedDict()
+_frame_stats = {"rendered": 0, "reused": 0}
+
+
+def frame_key(parts):
+    blob = json.dumps(parts, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def cached_frame(parts, render):
+    """tile for parts, calling render() only if no identical tile is cached
+
+    parts is a dict of everything the tile depends on. Tiles are kept in
+    memory for this process only; across runs the build cache keeps whole
+    sheets, which is cheaper than encoding and decoding 57 tile PNGs.
+    """
+    key = frame_key(parts)
+    tile = _tiles.get(key)
+    if tile is not None:
+        _tiles.move_to_end(key)
+        _frame_stats["reused"] += 1
+        return tile
+
+    tile = render()
+    _frame_stats["rendered"] += 1
+    _tiles[key] = tile
+    if len(_tiles) > FRAME_CACHE_SIZE:
+        _tiles.popitem(last=False)
+    return tile
+
+
+def frame_stats():
+    return dict(_frame_stats)
+
+
+def reset_frame_stats():
+    for name in _frame_stats:
+        _frame_stats[name] = 0
+
+
+def report_frame_renders():
+    stats = frame_stats()
+    print(f'Frames: {stats["rendered"]} rendered, '
+          f'{stats["reused"]} reused from cache')
@@ -0,0 +1,38 @@
+from PIL import Image, ImageDraw
+from functools import lru_cache
+
+from font_registry import get_font
+
+
+@lru_cache(maxsize=256)
+def glyph_stamp(text, family, size):
+    """(mask, offset) for text rasterized once per font and size
+
+    The mask is the anti-aliased coverage draw.text would blend, cropped
+    to the glyph box; offset is where that box sits relative to the text
+    origin. Colour is applied at paste time, so the four suit colours
+    share one mask per glyph.
+    """
+    font = get_font(family, size)
+    left, top, right, bottom = font.getbbox(text)
+    width, height = max(right - left, 1), max(bottom - top, 1)
+
+    # drawing 255 onto black leaves exactly the coverage draw.text uses
+    mask = Image.new("L", (width, height), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font)
+    return mask, (left, top)
+
+
+def stamp_text(img, xy, text, colour, family, size):
+    """paste the cached stamp for text where draw.text would have drawn it
+
+    A colour fill through the mask blends exactly as draw.text does, also
+    over the transparent card corners; pasting a solid RGBA tile would not.
+    """
+    mask, (left, top) = glyph_stamp(text, family, size)
+    img.paste(tuple(colour) + (255,), (xy[0] + left, xy[1] + top), mask)
+
+
+def stamp_stats():
+    info = glyph_stamp.cache_info()
+    return {"rasterized": info.misses, "reused": info.hits}
@@ -0,0 +1,256 @@
+from PIL import Image
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+import deck_maker
+from deck_maker import (FRAME_COUNT, SCALES, BORDER_STYLES, card_geometry, frame_origin,
+                        frame_stack, renderer_digest, render_deck, deck_output_path, parse_choices)
+from font_registry import BUNDLED_FONT_DIR, pin_font, resolve_font, font_digest
+from sheet_io import atomic_save, atomic_write_json
+
+# goldens are committed; regenerate them with --update. Checks and goldens
+# both render with the bundled DejaVu Sans in place of every family, so
+# they match on any host whatever fonts it has installed
+GOLDEN_DIR = "dev/art/golden"
+GOLDEN_FONT = os.path.join(BUNDLED_FONT_DIR, "DejaVuSans.ttf")
+GOLDEN_INDEX = os.path.join(GOLDEN_DIR, "index.json")
+FAILURE_DIR = "dev/.build-cache/golden"
+
+# a recoloured sheet may be this many levels off a re-render on the blend
+# ramps (neighbouring coverages round to the same pixel); pixels on no
+# ramp are left as they were, and may differ by more
+RECOLOUR_TOLERANCE = 1
+
+# the checked matrix: every border style at least once, both shipped scales
+DEFAULT_VARIANTS = [
+    (1, 1, 1, 2), (1, 1, 1, 1), (0, 0, 0, 2), (3, 3, 3, 2),
+    (2, 0, 3, 1), (0, 2, 1, 2), (3, 1, 0, 1), (1, 3, 2, 2),
+]
+
+
+def golden_path(variant):
+    return os.path.join(GOLDEN_DIR, os.path.basename(deck_output_path(*variant)))
+
+
+def diff_frames(current, golden, scale, tolerance=0):
+    """per-frame (changed pixels, max channel delta) arrays, all frames at once
+
+    A pixel counts as changed when any channel moved by more than tolerance.
+    """
+    delta = np.abs(frame_stack(current, scale).astype(np.int16)
+                   - frame_stack(golden, scale).astype(np.int16)).max(axis=-1)
+    changed = (delta > tolerance).sum(axis=(1, 2))
+    return changed, delta.max(axis=(1, 2)), delta
+
+
+def contact_sheet(current, golden, delta, failing, scale):
+    """golden, current and amplified diff side by side, one row per failing frame"""
+    card_width, card_height, _ = card_geometry(scale)
+    gap = 2 * scale
+    sheet = Image.new("RGBA", (3 * card_width + 4 * gap, len(failing) * (card_height + gap) + gap),
+                      (40, 40, 40, 255))
+    current_frames, golden_frames = frame_stack(current, scale), frame_stack(golden, scale)
+    for row, position in enumerate(failing):
+        y = gap + row * (card_height + gap)
+        heat = np.zeros((card_height, card_width, 4), dtype=np.uint8)
+        heat[..., 0] = np.minimum(delta[position].astype(np.int32) * 8, 255)
+        heat[..., 3] = 255
+        tiles = (golden_frames[position], current_frames[position], heat)
+        for col, tile in enumerate(tiles):
+            sheet.paste(Image.fromarray(np.ascontiguousarray(tile)),
+                        (gap + col * (card_width + gap), y))
+    return sheet
+
+
+def load_index():
+    try:
+        with open(GOLDEN_INDEX) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def check_variant(variant, tolerance, max_pixels):
+    """(status, message) for one variant against its golden, status ok, FAIL or skip"""
+    side, top, base, scale = variant
+    path = golden_path(variant)
+    if not os.path.exists(path):
+        return "skip", f"no golden at {path}; make one with --update"
+
+    current = np.asarray(render_deck(side, top, base, scale, use_cache=False))
+    with Image.open(path) as source:
+        golden = np.asarray(source.convert("RGBA"))
+    if current.shape != golden.shape:
+        return "FAIL", f"size {current.shape[1]}x{current.shape[0]}, golden {golden.shape[1]}x{golden.shape[0]}"
+
+    changed, max_delta, delta = diff_frames(current, golden, scale, tolerance)
+    failing = np.flatnonzero(changed > max_pixels).tolist()
+
+    # gutters and margins are outside every frame, check them as a whole
+    outside = np.abs(current.astype(np.int16) - golden.astype(np.int16)).max(axis=-1) > tolerance
+    card_width, card_height, card_spacing = card_geometry(scale)
+    for position in range(FRAME_COUNT):
+        xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+        outside[yt:yt + card_height, xt:xt + card_width] = False
+    gutter_pixels = int(outside.sum())
+
+    if not failing and gutter_pixels <= max_pixels:
+        return "ok", f"57 frames match (max delta {int(max_delta.max())})"
+
+    lines = [f"frame {p}: {int(changed[p])} px changed, max delta {int(max_delta[p])}" for p in failing]
+    if gutter_pixels > max_pixels:
+        lines.append(f"gutters: {gutter_pixels} px changed")
+    if failing:
+        report = os.path.join(FAILURE_DIR, os.path.basename(path))
+        atomic_save(contact_sheet(current, golden, delta, failing, scale), report)
+        lines.append(f"contact sheet: {report}")
+    return "FAIL", "\n    ".join([f"{len(failing)} frames differ"] + lines)
+
+
+@contextmanager
+def suit_colours(colours):
+    """render with deck_maker's suit colours swapped for colours"""
+    original = list(deck_maker.SUIT_COLOURS)
+    deck_maker.SUIT_COLOURS[:] = colours
+    try:
+        yield
+    finally:
+        deck_maker.SUIT_COLOURS[:] = original
+
+
+def check_recolour(variant):
+    """(status, message) for every theme recoloured against a re-render in it
+
+    Passes when ramp pixels are within RECOLOUR_TOLERANCE and no more
+    pixels differ elsewhere than the recolour found off its ramps.
+    """
+    # imported here so the golden check does not need the recolour stage
+    from sheet_recolour import THEMES, glyph_coverage, apply_colours, face_backgrounds
+
+    side, top, base, scale = variant
+    sheet = render_deck(side, top, base, scale, use_cache=False)
+    face_backgrounds(side, top, base, scale)
+    start = time.perf_counter()
+    pixels, ramp = glyph_coverage(sheet, side, top, base, scale, list(deck_maker.SUIT_COLOURS))
+    themed = {name: np.asarray(apply_colours(pixels, ramp, colours))
+              for name, colours in THEMES.items()}
+    elapsed = time.perf_counter() - start
+
+    on_ramp = np.zeros(pixels.shape[:2], dtype=bool)
+    on_ramp.reshape(-1)[ramp["index"]] = True
+    ramp_delta, off_pixels, off_delta = 0, 0, 0
+    for name, colours in THEMES.items():
+        with suit_colours(colours):
+            reference = np.asarray(render_deck(side, top, base, scale, use_cache=False))
+        delta = np.abs(themed[name].astype(np.int16) - reference.astype(np.int16)).max(axis=-1)
+        ramp_delta = max(ramp_delta, int(delta[on_ramp].max(initial=0)))
+        off = delta[~on_ramp]
+        off_pixels = max(off_pixels, int(np.count_nonzero(off)))
+        off_delta = max(off_delta, int(off.max(initial=0)))
+
+    message = (f"{len(THEMES)} themes in {elapsed * 1000:.0f} ms, max delta {ramp_delta} on the "
+               f"ramps, {off_pixels} px off them (up to {off_delta} levels, "
+               f"{ramp['misses']} found)")
+    if ramp_delta > RECOLOUR_TOLERANCE or off_pixels > ramp["misses"]:
+        return "FAIL", message
+    return "ok", message
+
+
+def update_goldens(variants):
+    index = load_index()
+    for variant in variants:
+        path = golden_path(variant)
+        atomic_save(render_deck(*variant, use_cache=False), path, optimize=True)
+        index[os.path.basename(path)] = {
+            "renderer": renderer_digest(),
+            "font": os.path.basename(resolve_font("Arial") or "pillow-default"),
+            "font_digest": font_digest("Arial"),
+        }
+        print(f"✓ golden saved to: {path}")
+    atomic_write_json(index, GOLDEN_INDEX)
+
+
+def warn_about_host(variants):
+    # goldens from another font or renderer version can't match
+    index = load_index()
+    for variant in variants:
+        entry = index.get(os.path.basename(golden_path(variant)))
+        if entry is None:
+            continue
+        if entry["font_digest"] != font_digest("Arial"):
+            print(f"Warning: goldens were made with {entry['font']}, this host renders with "
+                  f"{os.path.basename(resolve_font('Arial') or 'pillow-default')}")
+            return
+        if entry["renderer"] != renderer_digest():
+            print("Warning: goldens were made by other renderer code; "
+                  "run --update if the differences below are intended")
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff rendered sheets frame by frame against goldens')
+    parser.add_argument('--side', help="side border styles, e.g. 0,1 or all (default: the standard matrix)")
+    parser.add_argument('--top', help="top border styles")
+    parser.add_argument('--base', help="base border styles")
+    parser.add_argument('--scale', help="scale factors, e.g. 1,2")
+    parser.add_argument('--tolerance', type=int, default=0,
+                        help='channel difference ignored per pixel (default: 0, exact)')
+    parser.add_argument('--max-pixels', type=int, default=0,
+                        help='changed pixels allowed per frame before it fails (default: 0)')
+    parser.add_argument('--update', action='store_true',
+                        help='render and save new goldens instead of checking')
+    parser.add_argument('--recolour', action='store_true',
+                        help='instead of goldens, check every recolour theme against a '
+                             're-render with its suit colours')
+    args = parser.parse_args()
+
+    pin_font(GOLDEN_FONT)
+    if any((args.side, args.top, args.base, args.scale)):
+        try:
+            variants = list(itertools.product(
+                parse_choices(args.side or "1", BORDER_STYLES, 'side'),
+                parse_choices(args.top or "1", BORDER_STYLES, 'top'),
+                parse_choices(args.base or "1", BORDER_STYLES, 'base'),
+                parse_choices(args.scale or "2", SCALES, 'scale')))
+        except argparse.ArgumentTypeError as e:
+            parser.error(str(e))
+    else:
+        variants = DEFAULT_VARIANTS
+
+    if args.update:
+        update_goldens(variants)
+        return
+
+    if not args.recolour:
+        warn_about_host(variants)
+    start = time.perf_counter()
+    counts = {"ok": 0, "FAIL": 0, "skip": 0}
+    for variant in variants:
+        if args.recolour:
+            status, message = check_recolour(variant)
+        else:
+            status, message = check_variant(variant, args.tolerance, args.max_pixels)
+        counts[status] += 1
+        side, top, base, scale = variant
+        print(f"{status:<4} side={side} top={top} base={base} scale={scale}: {message}")
+
+    print(f"\n{counts['ok']} passed, {counts['FAIL']} failed, {counts['skip']} skipped "
+          f"in {time.perf_counter() - start:.2f}s")
+    if counts["skip"]:
+        print(f"Skipped variants have no golden in {GOLDEN_DIR}; run with --update and commit them")
+    if counts["FAIL"]:
+        sys.exit(1)
+    if not counts["ok"]:
+        print("Error: nothing was compared")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from collections import namedtuple
+import importlib
+import os
+import time
+
+from sheet_io import atomic_save, atomic_write_bytes, atomic_write_json
+
+# func is a callable or a "module:function" string resolved before the run.
+# It is called with its inputs as keyword arguments and returns one value
+# per output (a tuple when there is more than one).
+Stage = namedtuple("Stage", "name func inputs outputs")
+
+
+class PipelineError(Exception):
+    pass
+
+
+def resolve_stages(stages):
+    """replace "module:function" references with the functions themselves
+
+    Every stage is checked before anything runs, and all missing ones are
+    reported together.
+    """
+    resolved = []
+    problems = []
+    for stage in stages:
+        func = stage.func
+        if isinstance(func, str):
+            module_name, _, attr = func.partition(":")
+            try:
+                func = getattr(importlib.import_module(module_name), attr)
+            except (ImportError, AttributeError) as e:
+                problems.append(f"stage {stage.name}: cannot load {stage.func} ({e})")
+                continue
+        if not callable(func):
+            problems.append(f"stage {stage.name}: {func!r} is not callable")
+            continue
+        resolved.append(stage._replace(func=func))
+    if problems:
+        raise PipelineError("\n".join(problems))
+    return resolved
+
+
+def check_pipeline(stages, provided=(), artifacts=()):
+    """every input is produced exactly once, and nothing depends on itself"""
+    producers = {name: "(given)" for name in provided}
+    problems = []
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers:
+                problems.append(f"{output} produced by both {producers[output]} and {stage.name}")
+            producers[output] = stage.name
+
+    for stage in stages:
+        for name in stage.inputs:
+            if name not in producers:
+                problems.append(f"stage {stage.name} needs {name}, which nothing produces")
+    for name in artifacts:
+        if name not in producers:
+            problems.append(f"artifact {name} is never produced")
+
+    # a stage that can never become ready means a cycle
+    ready = set(provided)
+    pending = list(stages)
+    while pending:
+        runnable = [s for s in pending if all(name in ready for name in s.inputs)]
+        if not runnable:
+            break
+        for stage in runnable:
+            ready.update(stage.outputs)
+            pending.remove(stage)
+    if pending and not problems:
+        problems.append("cycle between stages: " + ", ".join(s.name for s in pending))
+
+    if problems:
+        raise PipelineError("\n".join(problems))
+
+
+def _run_stage(stage, values):
+    start = time.perf_counter()
+    result = stage.func(**{name: values[name] for name in stage.inputs})
+    elapsed = time.perf_counter() - start
+    if len(stage.outputs) == 1:
+        result = (result,)
+    elif len(result) != len(stage.outputs):
+        raise PipelineError(f"stage {stage.name} returned {len(result)} values, "
+                            f"expected {len(stage.outputs)}")
+    return dict(zip(stage.outputs, result)), elapsed
+
+
+def _save_artifact(value, path):
+    # images are encoded by extension, bytes written as they are,
+    # anything else is written as JSON
+    start = time.perf_counter()
+    if hasattr(value, "save"):
+        atomic_save(value, path)
+    elif isinstance(value, bytes):
+        atomic_write_bytes(value, path)
+    else:
+        atomic_write_json(value, path)
+    return time.perf_counter() - start
+
+
+def run_pipeline(stages, values=None, artifacts=None, workers=None):
+    """run stages in dependency order, independent ones concurrently
+
+    values holds the starting inputs. artifacts maps output names to the
+    paths they are saved to once everything has run; nothing else is
+    encoded. Returns (values, timings) with timings as (label, seconds).
+    """
+    values = dict(values or {})
+    artifacts = artifacts or {}
+    stages = resolve_stages(stages)
+    check_pipeline(stages, values, artifacts)
+
+    timings = []
+    pending = list(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        while pending or running:
+            for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                pending.remove(stage)
+                running[pool.submit(_run_stage, stage, values)] = stage
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                outputs, elapsed = future.result()
+                values.update(outputs)
+                timings.append((stage.name, elapsed))
+
+        saves = {pool.submit(_save_artifact, values[name], path): name
+                 for name, path in artifacts.items()}
+        for future, name in saves.items():
+            timings.append((f"save {name}", future.result()))
+
+    return values, timings
+
+
+def report_timings(timings, total=None):
+    width = max([len(label) for label, _ in timings] + [5])
+    for label, seconds in timings:
+        print(f"  {label:<{width}} {seconds * 1000:>8.1f} ms")
+    if total is not None:
+        print(f"  {'total':<{width}} {total * 1000:>8.1f} ms wall")
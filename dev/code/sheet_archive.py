@@ -0,0 +1,299 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from sheet_io import atomic_write_bytes
+
+try:
+    import fcntl
+except ImportError:  # Windows: the lock then only keeps this process's threads apart
+    fcntl = None
+
+# every sheet the builds replaced, stored once under its sha256, with an
+# append-only index of (time, name, params, hash); sheets are PNGs and
+# already deflated, so they are kept as they are
+ARCHIVE_DIR = "dev/art/archive"
+OBJECTS_DIR = os.path.join(ARCHIVE_DIR, "objects")
+PENDING_DIR = os.path.join(ARCHIVE_DIR, "pending")
+INDEX_PATH = os.path.join(ARCHIVE_DIR, "index.jsonl")
+LOCK_PATH = os.path.join(ARCHIVE_DIR, "lock")
+
+# default retention: the newest entries kept for each name
+KEEP_LAST = 20
+# pending files this old were left by a build that died mid-ingest
+STALE_PENDING_SECONDS = 3600
+
+_index_lock = threading.Lock()
+# ingest threads started and the lines they reported, for wait_for_archives
+_threads = []
+_reports = []
+
+
+def object_path(digest, ext=".png"):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest + ext)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _archive_lock():
+    """held while objects are stored or removed and the index changes
+
+    Ingests and prune take it, across threads and (with fcntl) processes,
+    so prune never sees a stored object before its index entry.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    with _index_lock, open(LOCK_PATH, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _append_index(entry):
+    # one short line per write, so appends from parallel builds don't interleave
+    with open(INDEX_PATH, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def read_index():
+    """index entries, oldest first"""
+    try:
+        with open(INDEX_PATH) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return []
+    entries = []
+    for line in lines:
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def _ingest(source, pending, entry):
+    """move pending into the store under its hash and record entry; returns a report line"""
+    if source is not None:
+        with source, open(pending, "wb") as f:
+            shutil.copyfileobj(source, f)
+    digest = _sha256(pending)
+    stored = object_path(digest, os.path.splitext(pending)[1])
+    entry.update(hash=digest, bytes=os.path.getsize(pending))
+    with _archive_lock():
+        if os.path.exists(stored):
+            os.remove(pending)
+            state = "already stored"
+        else:
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            os.replace(pending, stored)
+            state = "stored"
+        _append_index(entry)
+    return f"Archived previous {entry['path']} as {digest[:12]} ({state})"
+
+
+def _ingest_reporting(source, pending, entry):
+    # nothing is printed here, it would land in the middle of the build's output
+    try:
+        report = _ingest(source, pending, entry)
+    except Exception as e:
+        report = f"Warning: could not archive {entry['path']}: {e}"
+    with _index_lock:
+        _reports.append(report)
+
+
+def wait_for_archives():
+    """wait for every ingest started so far; returns their report lines"""
+    with _index_lock:
+        threads = _threads[:]
+        del _threads[:]
+    for thread in threads:
+        thread.join()
+    with _index_lock:
+        reports = _reports[:]
+        del _reports[:]
+    return reports
+
+
+@atexit.register
+def _report_archives():
+    # atexit runs once the interpreter has joined the ingest threads
+    for report in wait_for_archives():
+        print(report)
+
+
+def archive_file(path, name, params=None):
+    """archive the file at path as it is now, without waiting on the copy
+
+    The file is hard-linked into pending/ (or held open, where links are
+    not possible) so the caller can replace it straight away; a thread
+    hashes it, stores it once and appends to the index. The thread is not
+    a daemon, so the process finishes the ingest before it exits, and
+    what was archived is printed then, after the build's own output (or
+    collected sooner with wait_for_archives). Returns the thread, or None
+    when there is nothing at path.
+
+    path must then be replaced (atomic_save), not rewritten in place,
+    which would change the linked copy too.
+    """
+    if not os.path.exists(path):
+        return None
+    os.makedirs(PENDING_DIR, exist_ok=True)
+    pending = os.path.join(PENDING_DIR, uuid.uuid4().hex + os.path.splitext(path)[1])
+    try:
+        os.link(path, pending)
+        source = None
+    except OSError:
+        # an open file keeps its contents even once path is replaced
+        source = open(path, "rb")
+    entry = {"time": datetime.now().isoformat(timespec="seconds"), "name": name,
+             "path": path, "params": params or {}}
+    thread = threading.Thread(target=_ingest_reporting, args=(source, pending, entry),
+                              name=f"archive {name}")
+    with _index_lock:
+        _threads.append(thread)
+    thread.start()
+    return thread
+
+
+def prune(keep_last=KEEP_LAST, keep_days=None, now=None):
+    """apply a retention policy; returns (entries dropped, objects removed, bytes freed)
+
+    An entry survives if it is among the newest keep_last for its name or
+    younger than keep_days. Objects no surviving entry points at are
+    deleted. It holds the archive lock throughout, so builds ingesting at
+    the same time wait rather than lose their entries or objects. Pending
+    files are only removed once they are stale, counted from when they
+    were linked or copied in (ctime), not from the sheet's own mtime.
+    """
+    with _archive_lock():
+        return _prune(keep_last, keep_days, now)
+
+
+def _prune(keep_last, keep_days, now):
+    entries = read_index()
+    now = now or datetime.now()
+    by_name = {}
+    for entry in entries:
+        by_name.setdefault(entry["name"], []).append(entry)
+    kept = []
+    for name, named in by_name.items():
+        named.sort(key=lambda e: e["time"])
+        for age, entry in enumerate(reversed(named)):
+            recent = keep_days is not None and \
+                datetime.fromisoformat(entry["time"]) >= now - timedelta(days=keep_days)
+            if age < keep_last or recent:
+                kept.append(entry)
+    kept.sort(key=lambda e: e["time"])
+    if len(kept) != len(entries):
+        atomic_write_bytes("".join(json.dumps(e) + "\n" for e in kept).encode(),
+                           INDEX_PATH)
+
+    referenced = {e["hash"] for e in kept}
+    removed, freed = 0, 0
+    for directory, _, files in os.walk(OBJECTS_DIR):
+        for filename in files:
+            if os.path.splitext(filename)[0] not in referenced:
+                path = os.path.join(directory, filename)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+    if os.path.isdir(PENDING_DIR):
+        for filename in os.listdir(PENDING_DIR):
+            path = os.path.join(PENDING_DIR, filename)
+            if time.time() - os.path.getctime(path) > STALE_PENDING_SECONDS:
+                os.remove(path)
+    return len(entries) - len(kept), removed, freed
+
+
+def find_entry(prefix):
+    """the newest entry whose hash starts with prefix; ValueError if none or ambiguous"""
+    matches = [e for e in read_index() if e["hash"].startswith(prefix.lower())]
+    hashes = {e["hash"] for e in matches}
+    if not matches:
+        raise ValueError(f"no archived sheet has a hash starting {prefix}")
+    if len(hashes) > 1:
+        raise ValueError(f"{prefix} matches {len(hashes)} archived sheets, give more of the hash")
+    return max(matches, key=lambda e: e["time"])
+
+
+def restore(prefix, to=None):
+    """copy an archived sheet back into place; returns the path written
+
+    Whatever is at the destination is archived first, so a restore can be
+    undone the same way.
+    """
+    entry = find_entry(prefix)
+    stored = object_path(entry["hash"], os.path.splitext(entry["path"])[1])
+    if not os.path.exists(stored):
+        raise FileNotFoundError(stored)
+    destination = to or entry["path"]
+    archive_file(destination, entry["name"], {"replaced_by": entry["hash"][:12]})
+    with open(stored, "rb") as f:
+        atomic_write_bytes(f.read(), destination)
+    return destination
+
+
+def describe_params(params):
+    return " ".join(f"{key}={value}" for key, value in params.items())
+
+
+def list_entries(name=None):
+    entries = [e for e in read_index() if name is None or e["name"] == name]
+    for entry in entries:
+        print(f"  {entry['time']}  {entry['hash'][:12]}  {entry['bytes'] / 1024:>8.1f} KB  "
+              f"{entry['name']:<22} {describe_params(entry['params'])}")
+    distinct = {e["hash"]: e["bytes"] for e in entries}
+    print(f"{len(entries)} entries, {len(distinct)} distinct sheets, "
+          f"{sum(distinct.values()) / 1024 / 1024:.1f} MB stored "
+          f"for {sum(e['bytes'] for e in entries) / 1024 / 1024:.1f} MB archived")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List, restore and prune archived deck sheets')
+    commands = parser.add_subparsers(dest='command', required=True)
+    listing = commands.add_parser('list', help='show archived sheets, oldest first')
+    listing.add_argument('--name', help='only this kind of sheet, e.g. cards')
+    restoring = commands.add_parser('restore', help='put an archived sheet back')
+    restoring.add_argument('hash', help='hash of the sheet, or enough of its start to be unique')
+    restoring.add_argument('--to', help='where to write it (default: where it was archived from)')
+    pruning = commands.add_parser('prune', help='drop old entries and the sheets only they used')
+    pruning.add_argument('--keep-last', type=int, default=KEEP_LAST,
+                         help=f'newest entries kept for each name (default: {KEEP_LAST})')
+    pruning.add_argument('--keep-days', type=float,
+                         help='also keep every entry younger than this many days')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        list_entries(args.name)
+    elif args.command == 'restore':
+        try:
+            destination = restore(args.hash, args.to)
+        except (ValueError, FileNotFoundError) as e:
+            print(f'Error: {e}')
+            sys.exit(1)
+        print(f"Restored {args.hash} to: {destination}")
+    else:
+        if args.keep_last < 0:
+            print(f'Error: --keep-last must be 0 or more, got {args.keep_last}')
+            sys.exit(1)
+        dropped, removed, freed = prune(args.keep_last, args.keep_days)
+        print(f"Dropped {dropped} entries and {removed} sheets, freeing {freed / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
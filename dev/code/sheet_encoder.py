@@ -0,0 +1,155 @@
+from PIL import Image
+import argparse
+import io
+import os
+import sys
+import time
+import zlib
+
+from sheet_io import atomic_write_bytes, atomic_write_json
+from sheet_palette import to_indexed
+
+# (label, format, save options, palette) tried for every sheet. Pillow
+# picks the PNG row filters itself, so the PNG variants differ in zlib
+# level and strategy (compress_type); palette candidates are indexed
+# with their exact colours and skipped past 256.
+CANDIDATES = [
+    ("png default", "PNG", {}, False),
+    ("png level 9", "PNG", {"compress_level": 9}, False),
+    ("png optimize", "PNG", {"optimize": True}, False),
+    ("png filtered", "PNG", {"compress_level": 9, "compress_type": zlib.Z_FILTERED}, False),
+    ("png rle", "PNG", {"compress_level": 9, "compress_type": zlib.Z_RLE}, False),
+    ("png palette", "PNG", {"optimize": True}, True),
+    ("webp lossless", "WEBP", {"lossless": True, "quality": 100, "method": 6, "exact": True}, False),
+]
+
+EXTENSIONS = {"PNG": ".png", "WEBP": ".webp"}
+
+
+def encode(img, fmt, options):
+    buffer = io.BytesIO()
+    start = time.perf_counter()
+    img.save(buffer, format=fmt, **options)
+    return buffer.getvalue(), time.perf_counter() - start
+
+
+def decode(data):
+    start = time.perf_counter()
+    with Image.open(io.BytesIO(data)) as source:
+        source.load()
+        elapsed = time.perf_counter() - start
+        return source.convert("RGBA"), elapsed
+
+
+def try_candidates(img, formats=("PNG",), repeat=3):
+    """encode img every candidate way and check each decodes pixel-exact
+
+    Times are the best of repeat runs. Returns one dict per candidate with
+    label, format, bytes, encode_ms, decode_ms, exact and the encoded data.
+    """
+    img = img.convert("RGBA")
+    expected = img.tobytes()
+    results = []
+    for label, fmt, options, palette in CANDIDATES:
+        if fmt not in formats:
+            continue
+        source = to_indexed(img) if palette else img
+        if source is None:
+            results.append({"label": label, "format": fmt, "bytes": None, "encode_ms": None,
+                            "decode_ms": None, "exact": False, "data": None})
+            continue
+
+        encode_times, decode_times = [], []
+        for _ in range(repeat):
+            data, seconds = encode(source, fmt, options)
+            encode_times.append(seconds)
+            decoded, seconds = decode(data)
+            decode_times.append(seconds)
+
+        results.append({
+            "label": label,
+            "format": fmt,
+            "bytes": len(data),
+            "encode_ms": min(encode_times) * 1000,
+            "decode_ms": min(decode_times) * 1000,
+            "exact": decoded.tobytes() == expected,
+            "data": data,
+        })
+    return results
+
+
+def smallest_exact(results):
+    exact = [r for r in results if r["exact"]]
+    if not exact:
+        raise ValueError("no candidate encoding reproduced the sheet exactly")
+    return min(exact, key=lambda r: (r["bytes"], r["decode_ms"]))
+
+
+def encoding_report(results, chosen):
+    """results without the encoded bytes, for writing as JSON"""
+    return {
+        "chosen": chosen["label"],
+        "candidates": [{k: v for k, v in r.items() if k != "data"} for r in results],
+    }
+
+
+def print_encoding_report(results, chosen):
+    print(f"{'candidate':<14} {'bytes':>9} {'encode ms':>10} {'decode ms':>10}  exact")
+    for r in results:
+        if r["bytes"] is None:
+            print(f"{r['label']:<14} {'-':>9} {'-':>10} {'-':>10}  skipped, over 256 colours")
+            continue
+        mark = "*" if r is chosen else " "
+        print(f"{r['label']:<14} {r['bytes']:>9} {r['encode_ms']:>10.1f} "
+              f"{r['decode_ms']:>10.1f}  {'yes' if r['exact'] else 'NO'} {mark}")
+
+
+def encode_sheet(img, formats=("PNG",), repeat=1):
+    """(encoded bytes, format, report) for the smallest pixel-exact encoding"""
+    results = try_candidates(img, formats, repeat)
+    chosen = smallest_exact(results)
+    return chosen["data"], chosen["format"], encoding_report(results, chosen)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Re-encode a sheet as the smallest pixel-exact PNG (or WebP)')
+    parser.add_argument('sheet', help='sheet image to re-encode')
+    parser.add_argument('--webp', action='store_true',
+                        help='also try lossless WebP, written beside the sheet if it wins')
+    parser.add_argument('--report', help='write the candidate report as JSON to this path')
+    parser.add_argument('--dry-run', action='store_true', help='report only, keep the sheet as is')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.sheet):
+        print(f'Error: sheet not found: {args.sheet}')
+        sys.exit(1)
+
+    with Image.open(args.sheet) as source:
+        img = source.convert("RGBA")
+    before = os.path.getsize(args.sheet)
+
+    formats = ("PNG", "WEBP") if args.webp else ("PNG",)
+    results = try_candidates(img, formats)
+    try:
+        chosen = smallest_exact(results)
+    except ValueError as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+    print_encoding_report(results, chosen)
+
+    if args.report:
+        atomic_write_json(encoding_report(results, chosen), args.report)
+    if args.dry_run:
+        return
+
+    output_path = os.path.splitext(args.sheet)[0] + EXTENSIONS[chosen["format"]]
+    if chosen["bytes"] >= before and output_path == args.sheet:
+        print(f"{args.sheet} is already as small as it gets ({before} bytes)")
+        return
+    atomic_write_bytes(chosen["data"], output_path)
+    print(f"Saved {chosen['label']} to: {output_path} ({before} -> {chosen['bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
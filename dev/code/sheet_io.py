@@ -0,0 +1,70 @@
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+# mkstemp files are owner-only, results get the usual mode for this umask.
+# The umask can only be read by setting it, process-wide, so it is read
+# once here rather than per write while other threads may be creating files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+
+@contextmanager
+def atomic_stream(output_path, mode="wb"):
+    """file written in pieces, renamed over output_path when closed
+
+    It is written to a temporary file beside output_path and then renamed
+    over it, which is atomic on the same filesystem, so readers never see a
+    half-written file.
+    """
+    directory = os.path.dirname(output_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    name, ext = os.path.splitext(os.path.basename(output_path))
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=ext, dir=directory)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_save(img, output_path, **save_options):
+    """save img so readers never see a half-written file"""
+    image_format = save_options.pop("format", None) or _format_for(os.path.splitext(output_path)[1])
+    with atomic_stream(output_path) as f:
+        img.save(f, format=image_format, **save_options)
+    return output_path
+
+
+def _format_for(ext):
+    return {".png": "PNG", ".webp": "WEBP", ".jpg": "JPEG", ".jpeg": "JPEG"}.get(ext.lower(), "PNG")
+
+
+def atomic_write_bytes(data, output_path):
+    """write already-encoded bytes with the same write-then-rename"""
+    with atomic_stream(output_path) as f:
+        f.write(data)
+    return output_path
+
+
+def atomic_copy(source_path, output_path):
+    """copy a file into place with the same write-then-rename"""
+    with open(source_path, "rb") as source, atomic_stream(output_path) as f:
+        shutil.copyfileobj(source, f)
+    return output_path
+
+
+def atomic_write_json(data, output_path):
+    """write data as JSON with the same write-then-rename as atomic_save"""
+    with atomic_stream(output_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+    return output_path
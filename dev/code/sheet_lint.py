@@ -0,0 +1,162 @@
+from PIL import Image
+import argparse
+import hashlib
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+from deck_maker import (FRAME_COUNT, CARDS_ACROSS, CARDS_DOWN, CARD_VALUES, SUIT_LETTERS,
+                        TALONS_FRAME, ALTERNATE_FRAME, FEATHER_FRAME, SCALES, BORDER_STYLES, card_geometry,
+                        frame_stack, load_blank, deck_output_path, parse_choices)
+
+# frames the renderer leaves as plain blanks
+BLANK_FRAMES = range(52, 54)
+
+
+def frame_label(position):
+    if position < 52:
+        suit_index, value_index = divmod(position, len(CARD_VALUES))
+        return CARD_VALUES[value_index] + SUIT_LETTERS[suit_index]
+    return {TALONS_FRAME: "talons", ALTERNATE_FRAME: "alternate", FEATHER_FRAME: "feathers"}.get(
+        position, "blank")
+
+
+def gutter_owners(scale):
+    """(gutter, owner): which sheet pixels lie between frames, and the frame
+    each belongs to, the one to its left or above (the first for the margins)"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+    pitch_x, pitch_y = card_width + card_spacing, card_height + card_spacing
+    x = np.arange(card_spacing + CARDS_ACROSS * pitch_x) - card_spacing
+    y = np.arange(card_spacing + CARDS_DOWN * pitch_y) - card_spacing
+    in_x = (x >= 0) & (x % pitch_x < card_width)
+    in_y = (y >= 0) & (y % pitch_y < card_height)
+    gutter = ~(in_y[:, None] & in_x[None, :])
+    col = np.clip(x // pitch_x, 0, CARDS_ACROSS - 1)
+    row = np.clip(y // pitch_y, 0, CARDS_DOWN - 1)
+    return gutter, row[:, None] * CARDS_ACROSS + col[None, :]
+
+
+def lint_sheet(sheet, blank, scale):
+    """per-frame findings for a sheet array against its blank, all frames at once
+
+    bleed counts non-transparent gutter pixels the blank does not have
+    (art or ink that spilled), overhang the ones it does (border strokes
+    wider than the spacing). outside counts pixels drawn where the blank
+    is transparent inside the frame, past the rounded corners. empty
+    frames are transparent or untouched blanks; duplicate_of is the first
+    earlier frame with the same pixels, or -1.
+    """
+    gutter, owner = gutter_owners(scale)
+    visible = gutter & (sheet[..., 3] > 0)
+    spilled = visible & np.any(sheet != blank, axis=-1)
+    bleed = np.bincount(owner[spilled], minlength=FRAME_COUNT)
+    overhang = np.bincount(owner[visible & ~spilled], minlength=FRAME_COUNT)
+
+    frames, blanks = frame_stack(sheet, scale), frame_stack(blank, scale)
+    outside = ((blanks[..., 3] == 0) & (frames[..., 3] > 0)).sum(axis=(1, 2))
+    empty = ~frames[..., 3].any(axis=(1, 2)) | (frames == blanks).all(axis=(1, 2, 3))
+
+    duplicate_of = np.full(FRAME_COUNT, -1)
+    first = {}
+    for position in range(FRAME_COUNT):
+        if empty[position]:
+            continue
+        digest = hashlib.blake2b(np.ascontiguousarray(frames[position]).tobytes()).digest()
+        original = first.setdefault(digest, position)
+        if original != position:
+            duplicate_of[position] = original
+    return {"bleed": bleed, "overhang": overhang, "outside": outside,
+            "empty": empty, "duplicate_of": duplicate_of}
+
+
+def frame_problems(findings, position, strict=False):
+    """the problems found in one frame, as short phrases"""
+    problems = []
+    if findings["bleed"][position]:
+        problems.append(f"{findings['bleed'][position]} px bleed into the gutter")
+    if strict and findings["overhang"][position]:
+        problems.append(f"{findings['overhang'][position]} px of border in the gutter")
+    if findings["outside"][position]:
+        problems.append(f"{findings['outside'][position]} px outside the rounded corners")
+    if findings["empty"][position] and position not in BLANK_FRAMES:
+        problems.append("empty")
+    if findings["duplicate_of"][position] >= 0:
+        original = findings["duplicate_of"][position]
+        problems.append(f"same as frame {original} ({frame_label(original)})")
+    return problems
+
+
+def lint_variant(variant, sheet_path, strict=False, every_frame=False):
+    """print the report for one built sheet; returns the number of problem frames"""
+    side, top, base, scale = variant
+    print(f"side={side} top={top} base={base} scale={scale}: {sheet_path}")
+    if not os.path.exists(sheet_path):
+        print("  FAIL sheet not found (build it with deck_maker.py first)")
+        return 1
+
+    with Image.open(sheet_path) as source:
+        sheet = np.asarray(source.convert("RGBA"))
+    blank = np.asarray(load_blank(side, top, base, scale))
+    if sheet.shape != blank.shape:
+        print(f"  FAIL sheet is {sheet.shape[1]}x{sheet.shape[0]}, "
+              f"scale {scale} needs {blank.shape[1]}x{blank.shape[0]}")
+        return 1
+
+    findings = lint_sheet(sheet, blank, scale)
+    failing = 0
+    for position in range(FRAME_COUNT):
+        problems = frame_problems(findings, position, strict)
+        failing += bool(problems)
+        if problems or every_frame:
+            status = "FAIL" if problems else "ok  "
+            print(f"  {status} {position:>2} {frame_label(position):<9} {'; '.join(problems)}".rstrip())
+    overhang = int(findings["overhang"].sum())
+    if overhang and not strict:
+        print(f"  note: {overhang} px of border strokes overhang the gutters (--strict fails on them)")
+    print(f"  {FRAME_COUNT - failing} frames ok, {failing} with problems")
+    return failing
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check built deck sheets for gutter bleed, art past the corners, '
+                    'and empty or duplicate frames')
+    parser.add_argument('--side', default='1', help="side border styles, e.g. 0,1 or all (default: 1)")
+    parser.add_argument('--top', default='1', help="top border styles (default: 1)")
+    parser.add_argument('--base', default='1', help="base border styles (default: 1)")
+    parser.add_argument('--scale', default='2', help="scale factors, e.g. 1,2 (default: 2)")
+    parser.add_argument('--sheet', help='sheet to check (default: the built deck for each variant)')
+    parser.add_argument('--strict', action='store_true',
+                        help='also fail on border strokes that overhang into the gutters')
+    parser.add_argument('--all-frames', action='store_true', help='list every frame, not just failing ones')
+    args = parser.parse_args()
+
+    try:
+        variants = list(itertools.product(
+            parse_choices(args.side, BORDER_STYLES, 'side'),
+            parse_choices(args.top, BORDER_STYLES, 'top'),
+            parse_choices(args.base, BORDER_STYLES, 'base'),
+            parse_choices(args.scale, SCALES, 'scale')))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if args.sheet and len(variants) > 1:
+        print('Error: --sheet needs a single side, top, base and scale to give its geometry')
+        sys.exit(1)
+
+    start = time.perf_counter()
+    failures = 0
+    for variant in variants:
+        sheet_path = args.sheet or deck_output_path(*variant)
+        failures += bool(lint_variant(variant, sheet_path, args.strict, args.all_frames))
+
+    print(f"\n{len(variants) - failures} sheets passed, {failures} failed "
+          f"in {time.perf_counter() - start:.2f}s")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
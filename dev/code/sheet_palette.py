@@ -0,0 +1,121 @@
+from PIL import Image
+import argparse
+import io
+import os
+import sys
+
+import numpy as np
+
+from deck_maker import FRAME_COUNT, card_geometry, frame_origin
+from sheet_io import atomic_save
+
+MAX_COLOURS = 256
+
+
+def _pixels(img):
+    # one uint32 per RGBA pixel, so exact colours compare as integers
+    rgba = np.ascontiguousarray(np.asarray(img.convert("RGBA")))
+    return rgba.view(np.uint32).reshape(rgba.shape[:2])
+
+
+def count_colours(img):
+    """number of exact RGBA colours in img"""
+    return len(np.unique(_pixels(img)))
+
+
+def to_indexed(img):
+    """img as an 8-bit palette image with tRNS alpha, or None past 256 colours
+
+    Palette entries hold the exact RGBA values, so nothing is quantized.
+    """
+    pixels = _pixels(img)
+    colours, indices = np.unique(pixels, return_inverse=True)
+    if len(colours) > MAX_COLOURS:
+        return None
+
+    entries = colours.view(np.uint8).reshape(-1, 4)
+    indexed = Image.frombytes("P", img.size, indices.astype(np.uint8).tobytes())
+    indexed.putpalette(entries[:, :3].tobytes(), "RGB")
+    indexed.info["transparency"] = entries[:, 3].tobytes()
+    return indexed
+
+
+def round_trip_exact(img, indexed):
+    """True if indexed encodes to PNG and decodes back to exactly img's pixels"""
+    buffer = io.BytesIO()
+    indexed.save(buffer, format="PNG", optimize=True)
+    with Image.open(io.BytesIO(buffer.getvalue())) as decoded:
+        return decoded.convert("RGBA").tobytes() == img.convert("RGBA").tobytes()
+
+
+def colour_overflow(img, scale, frame_count=FRAME_COUNT):
+    """(frame, new colours, running total) for frames that took the sheet past 256
+
+    Frames are added in index order; the gutters and margin count first.
+    """
+    pixels = _pixels(img)
+    card_width, card_height, card_spacing = card_geometry(scale)
+
+    outside = np.ones(pixels.shape, dtype=bool)
+    boxes = []
+    for position in range(frame_count):
+        xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+        boxes.append((slice(yt, yt + card_height), slice(xt, xt + card_width)))
+        outside[boxes[-1]] = False
+
+    seen = np.unique(pixels[outside])
+    overflow = []
+    for position, box in enumerate(boxes):
+        new = np.setdiff1d(np.unique(pixels[box]), seen, assume_unique=True)
+        seen = np.union1d(seen, new)
+        if len(seen) > MAX_COLOURS and len(new):
+            overflow.append((position, len(new), len(seen)))
+    return overflow
+
+
+def index_sheet(img, scale):
+    """indexed sheet when it fits in 256 colours, else img with a warning
+
+    The indexed result is only returned after a byte-exact PNG round trip.
+    """
+    indexed = to_indexed(img)
+    if indexed is None:
+        overflow = colour_overflow(img, scale)
+        listed = ", ".join(f"{position} (+{new})" for position, new, _ in overflow)
+        print(f"Warning: sheet has {count_colours(img)} colours, over {MAX_COLOURS}; "
+              f"keeping RGBA. Frames past the limit: {listed}")
+        return img
+    if not round_trip_exact(img, indexed):
+        print("Warning: indexed sheet did not round-trip exactly, keeping RGBA")
+        return img
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Rewrite a sheet as an 8-bit indexed PNG when it has 256 colours or fewer')
+    parser.add_argument('sheet', help='sheet PNG, 3 cards across with spacing')
+    parser.add_argument('--scale', type=int, default=2, help='scale the sheet was rendered at')
+    parser.add_argument('--output', help='indexed PNG path (default: overwrite the sheet)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.sheet):
+        print(f'Error: sheet not found: {args.sheet}')
+        sys.exit(1)
+
+    with Image.open(args.sheet) as source:
+        img = source.convert("RGBA")
+    print(f"{args.sheet}: {count_colours(img)} colours")
+
+    result = index_sheet(img, args.scale)
+    if result is img:
+        sys.exit(1)
+
+    output_path = args.output or args.sheet
+    before = os.path.getsize(args.sheet)
+    atomic_save(result, output_path, optimize=True)
+    print(f"Saved indexed sheet to: {output_path} ({before} -> {os.path.getsize(output_path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+from PIL import Image
+import argparse
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from deck_maker import (SUIT_COLOURS, SUIT_LETTERS, CARD_VALUES, card_geometry,
+                        frame_origin, load_blank, paste_card_art, deck_output_path,
+                        add_variant_arguments, check_variant_arguments)
+from sheet_io import atomic_save
+
+# suit colours in clubs, diamonds, hearts, spades order
+THEMES = {
+    "classic": list(SUIT_COLOURS),
+    "four-colour": [(0, 128, 60), (0, 90, 200), (255, 15, 15), (20, 20, 20)],
+    "high-contrast": [(0, 0, 0), (200, 0, 0), (200, 0, 0), (0, 0, 0)],
+    # Okabe-Ito, distinguishable with the common colour vision deficiencies
+    "colour-blind": [(0, 114, 178), (230, 159, 0), (213, 94, 0), (0, 0, 0)],
+    "monochrome": [(20, 20, 20)] * 4,
+    "muted": [(96, 104, 112), (176, 96, 112), (184, 64, 64), (48, 48, 56)],
+    "forest": [(34, 85, 51), (153, 102, 51), (170, 51, 34), (17, 51, 34)],
+    "ocean": [(40, 90, 120), (0, 150, 170), (230, 90, 80), (10, 40, 70)],
+    "autumn": [(110, 80, 40), (210, 120, 20), (180, 40, 20), (60, 30, 20)],
+    "royal": [(70, 50, 120), (200, 60, 140), (190, 20, 60), (30, 20, 60)],
+    "slate": [(70, 80, 90), (120, 90, 160), (200, 50, 90), (25, 30, 35)],
+    "bright": [(0, 160, 0), (0, 100, 255), (255, 0, 0), (0, 0, 0)],
+}
+
+# ranks and suit glyphs sit in the top of each face; their ink reaches
+# about 32 units down, past the top of the art, so leave some room
+HEADER_UNITS = 40
+FACE_COUNT = 4 * len(CARD_VALUES)
+
+
+def _header_index(scale):
+    """row and column index arrays picking every face's header out of the sheet"""
+    card_width, card_height, card_spacing = card_geometry(scale)
+    origins = [frame_origin(p, card_width, card_height, card_spacing) for p in range(FACE_COUNT)]
+    rows = np.array([[y + r for r in range(HEADER_UNITS * scale)] for _, y in origins])
+    cols = np.array([[x + c for c in range(card_width)] for x, _ in origins])
+    return rows[:, :, None], cols[:, None, :]
+
+
+@lru_cache(maxsize=4)
+def face_backgrounds(side, top, base, scale):
+    """what each face header looked like before its rank and suit were stamped
+
+    The blank with the suit's art pasted on, as (faces, rows, cols, 4).
+    """
+    card_width, card_height, card_spacing = card_geometry(scale)
+    blank = load_blank(side, top, base, scale)
+    backgrounds = []
+    for position in range(FACE_COUNT):
+        xt, yt = frame_origin(position, card_width, card_height, card_spacing)
+        tile = blank.crop((xt, yt, xt + card_width, yt + card_height))
+        paste_card_art(tile, 0, 0, position // len(CARD_VALUES), scale, card_width, card_height)
+        backgrounds.append(np.asarray(tile)[:HEADER_UNITS * scale])
+    return np.stack(backgrounds).astype(np.int32)
+
+
+def _blend(background, colour, coverage):
+    """Pillow's fill through a mask, on int arrays of RGBA pixels
+
+    DIV255(background * (255 - a) + colour * a) per channel, except that
+    over a fully transparent pixel the colour is written as is, with
+    alpha a.
+    """
+    x = background * (255 - coverage) + colour * coverage + 128
+    blended = (x + (x >> 8)) >> 8
+    clear = (background[..., 3:] == 0) & (coverage > 0)
+    over_clear = np.concatenate([np.broadcast_to(colour[..., :3], blended[..., :3].shape),
+                                 np.broadcast_to(coverage, blended[..., 3:].shape)], axis=-1)
+    return np.where(clear, over_clear, blended)
+
+
+def ramp_coverage(pixels, background, source):
+    """coverage of source over background for each pixel, -1 where off the ramp
+
+    The channel with the most contrast gives the estimate (alpha, over
+    transparent corners); when that is not an exact hit its neighbours are
+    tried, as rounding can move it by one. Neighbouring coverages can
+    round to the same pixel, so a recoloured pixel may be one level off a
+    full re-render.
+    """
+    source = np.array(tuple(source) + (255,), dtype=np.int32)
+    contrast = source - background
+    channel = np.where(background[:, 3] == 0, 3, np.argmax(np.abs(contrast), axis=-1))[:, None]
+    moved = np.take_along_axis(pixels - background, channel, axis=-1)[:, 0]
+    spread = np.take_along_axis(contrast, channel, axis=-1)[:, 0]
+    estimate = np.rint(moved * 255 / np.where(spread == 0, 1, spread)).astype(np.int32)
+
+    coverage = np.full(len(pixels), -1, dtype=np.int32)
+    pending = np.arange(len(pixels))
+    for step in (0, -1, 1, -2, 2):
+        candidate = np.clip(estimate[pending] + step, 0, 255)
+        hit = np.all(_blend(background[pending], source, candidate[:, None]) == pixels[pending],
+                     axis=-1)
+        coverage[pending[hit]] = candidate[hit]
+        pending = pending[~hit]
+        if not len(pending):
+            break
+    return coverage
+
+
+def glyph_coverage(sheet, side, top, base, scale, source=SUIT_COLOURS):
+    """where the suit colours were stamped on the faces, and how strongly
+
+    Returns (pixels, ramp) where ramp holds the header pixels that differ
+    from the blank-plus-art background and lie on their suit colour's
+    blend ramp: their flat index into the sheet, background, coverage
+    and suit. It depends only on the sheet, so one result serves any
+    number of colour schemes.
+    """
+    pixels = np.array(sheet.convert("RGBA"))
+    rows, cols = _header_index(scale)
+    headers = pixels[rows, cols].astype(np.int32)
+    backgrounds = face_backgrounds(side, top, base, scale)
+
+    changed = np.any(headers != backgrounds, axis=-1)
+    suits = np.broadcast_to((np.arange(FACE_COUNT) // len(CARD_VALUES))[:, None, None],
+                            changed.shape)[changed]
+    index = np.flatnonzero(changed)
+    sheet_index = np.broadcast_to(rows * pixels.shape[1] + cols, changed.shape).reshape(-1)[index]
+    flat_headers = headers.reshape(-1, 4)[index]
+    flat_backgrounds = backgrounds.reshape(-1, 4)[index]
+
+    coverage = np.full(len(index), -1, dtype=np.int32)
+    for suit_index in range(len(SUIT_LETTERS)):
+        ours = np.flatnonzero(suits == suit_index)
+        coverage[ours] = ramp_coverage(flat_headers[ours], flat_backgrounds[ours],
+                                       source[suit_index])
+    on_ramp = coverage >= 0
+    ramp = {
+        "index": sheet_index[on_ramp],
+        "background": flat_backgrounds[on_ramp],
+        "coverage": coverage[on_ramp],
+        "suit": suits[on_ramp],
+        "misses": int(np.count_nonzero(~on_ramp)),
+    }
+    return pixels, ramp
+
+
+def apply_colours(pixels, ramp, colours):
+    """the sheet with every ramp pixel blended again from its suit's new colour"""
+    targets = np.array([tuple(c) + (255,) for c in colours], dtype=np.int32)[ramp["suit"]]
+    themed = pixels.copy()
+    themed.reshape(-1, 4)[ramp["index"]] = _blend(ramp["background"], targets,
+                                                  ramp["coverage"][:, None])
+    return Image.fromarray(themed, "RGBA")
+
+
+def recolour_sheet(sheet, colours, side, top, base, scale, source=SUIT_COLOURS):
+    """sheet with each suit's colour swapped for colours[suit]; returns (sheet, misses)
+
+    Only the face headers are touched, so art and backs stay as they are.
+    misses counts changed pixels that were on no colour ramp (glyphs
+    overlapping each other, say), which are left as they were.
+    """
+    pixels, ramp = glyph_coverage(sheet, side, top, base, scale, source)
+    return apply_colours(pixels, ramp, colours), ramp["misses"]
+
+
+def themed_path(side, top, base, scale, theme):
+    name, ext = os.path.splitext(deck_output_path(side, top, base, scale))
+    return f"{name}_theme-{theme}{ext}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Recolour the suits of a rendered deck sheet without re-rendering it')
+    add_variant_arguments(parser)
+    parser.add_argument('--theme', default='all',
+                        help=f"comma separated, from {', '.join(THEMES)} (default: all)")
+    parser.add_argument('--sheet', help='rendered sheet (default: the built deck for these options)')
+    args = parser.parse_args()
+
+    check_variant_arguments(args)
+    themes = list(THEMES) if args.theme == 'all' else \
+        [name.strip() for name in args.theme.split(",") if name.strip()]
+    unknown = [name for name in themes if name not in THEMES]
+    if unknown or not themes:
+        print(f"Error: unknown themes {', '.join(unknown) or '(none given)'}; "
+              f"choose from {', '.join(THEMES)}")
+        sys.exit(1)
+    sheet_path = args.sheet or deck_output_path(args.side, args.top, args.base, args.scale)
+    if not os.path.exists(sheet_path):
+        print(f'Error: sheet not found: {sheet_path} (build it with deck_maker.py first)')
+        sys.exit(1)
+
+    with Image.open(sheet_path) as source:
+        sheet = source.convert("RGBA")
+
+    start = time.perf_counter()
+    pixels, ramp = glyph_coverage(sheet, args.side, args.top, args.base, args.scale)
+    total = time.perf_counter() - start
+    print(f"  {'coverage':<14} {total * 1000:>7.1f} ms  {len(ramp['index'])} glyph pixels")
+    if ramp["misses"]:
+        print(f"  {ramp['misses']} changed pixels are on no suit colour ramp and are left as they were")
+
+    for theme in themes:
+        start = time.perf_counter()
+        themed = apply_colours(pixels, ramp, THEMES[theme])
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        output_path = themed_path(args.side, args.top, args.base, args.scale, theme)
+        atomic_save(themed, output_path)
+        print(f"  {theme:<14} {elapsed * 1000:>7.1f} ms  {output_path}")
+    print(f"{len(themes)} themes recoloured in {total * 1000:.0f} ms (saving not included)")
+
+
+if __name__ == "__main__":
+    main()
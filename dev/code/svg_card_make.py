@@ -2,7 +2,6 @@
 # Phaser rectangle, SVG number, SVG suit-symbol, PNG graphic 
 # but game code based on Frame making Image Object and would need big restructuring 
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 import os
 
 def create_svg_card(value, colour_rgb, filename):
@@ -70,16 +69,9 @@ def create_svg_card(value, colour_rgb, filename):
     comment = ET.Comment(' PNG graphic would be inserted here as: <image href="graphic.png" x="4" y="76" width="62" height="20"/> ')
     svg.append(comment)
     
-    rough_string = ET.tostring(svg, 'unicode')
-    reparsed = minidom.parseString(rough_string)
-    pretty_svg = reparsed.toprettyxml(indent="  ")
-    
-    # remove extra whitespace
-    lines = [line for line in pretty_svg.split('\n') if line.strip()]
-    clean_svg = '\n'.join(lines)
-    
-    with open(filename, 'w') as f:
-        f.write(clean_svg)
+    # indent in place rather than re-parsing the serialised tree with minidom
+    ET.indent(svg, space="  ")
+    ET.ElementTree(svg).write(filename, encoding="unicode", xml_declaration=True)
     
     print(f"created SVG card: {filename}")
 
@@ -1,4 +1,5 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+from font_registry import get_font
 
 def test_suit_fonts():
     # create test image
@@ -9,22 +10,22 @@ def test_suit_fonts():
     
     # fonts to test
     test_fonts = [
-        ("/System/Library/Fonts/Arial.ttf", "Arial"),
-        ("/System/Library/Fonts/Apple Symbols.ttf", "Apple Symbols"),
-        # ("/System/Library/Fonts/Supplemental/Segoe UI Symbol.ttf", "Segoe UI Symbol"),
-        # ("/System/Library/Fonts/Supplemental/DejaVu Sans.ttf", "DejaVu Sans"),
-        ("/System/Library/Fonts/Helvetica.ttc", "Helvetica"),
+        "Arial",
+        "Apple Symbols",
+        # "Segoe UI Symbol",
+        # "DejaVu Sans",
+        "Helvetica",
     ]
 
     suit_symbols = '♣♦♥♠'
     font_size = 24
     y_pos = 20
 
-    label_font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 12)
+    label_font = get_font("Arial", 12)
     
-    for font_path, font_name in test_fonts:
+    for font_name in test_fonts:
         try:
-            test_font = ImageFont.truetype(font_path, font_size)
+            test_font = get_font(font_name, font_size)
 
             # draw font name label
             draw.text((10, y_pos), font_name, fill=(100, 100, 100), font=label_font)
@@ -1,7 +1,10 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import os
 import shutil
 from datetime import datetime
+from font_registry import get_font
+from art_cache import load_scaled_art
+from deck_maker import SUIT_ART
 
 def generate_cards():
     # card dimensions and layout
@@ -33,7 +36,7 @@ def generate_cards():
     try:
         img = Image.open(input_path)
         draw = ImageDraw.Draw(img)
-        phFont = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 36 * scale)     
+        phFont = get_font("Arial", 36 * scale)     
         
         # generate 52 cards (4 suits, each 13 values)
         card_position = 0
@@ -75,39 +78,11 @@ def generate_cards():
 
                 graphic_y = rect_y1 + 4 * scale  # start below top area
 
-                # if suit Spades paste coloured version of first owl image
-                if suitLetter == 's':
-                  owl_img = Image.open("public/assets/images/owl_1a.png")
-                  if owl_img.mode != 'RGBA':
-                    owl_img = owl_img.convert('RGBA')
-                  # centre owl face image which is 96x84
-                  owl_x = x - 96 // 2
-                  owl_y = y - 84 // 2 + 12 * scale
-                  img.paste(owl_img, (owl_x, owl_y), owl_img.split()[3])
-                
-                elif suitLetter == 'c':
-                  crow_img = Image.open("public/assets/images/crow.png")
-                  if crow_img.mode != 'RGBA':
-                    crow_img = crow_img.convert('RGBA')
-                  crow_x = x - 96 // 2
-                  crow_y = y - 84 // 2 + 12 * scale
-                  img.paste(crow_img, (crow_x, crow_y), crow_img.split()[3])
-
-                elif suitLetter == 'h':
-                  eagle_img = Image.open("public/assets/images/eagle.png")
-                  if eagle_img.mode != 'RGBA':
-                    eagle_img = eagle_img.convert('RGBA')
-                  eagle_x = x - 96 // 2
-                  eagle_y = y - 84 // 2 + 12 * scale
-                  img.paste(eagle_img, (eagle_x, eagle_y), eagle_img.split()[3])
-
-                elif suitLetter == 'd':
-                  redkite_img = Image.open("public/assets/images/red-kite-3.png")
-                  if redkite_img.mode != 'RGBA':
-                    redkite_img = redkite_img.convert('RGBA')
-                  redkite_x = x - 96 // 2
-                  redkite_y = y - 84 // 2 + 12 * scale
-                  img.paste(redkite_img, (redkite_x, redkite_y), redkite_img.split()[3])
+                # paste the suit's bird image, centred below the header
+                art_img, art_mask = load_scaled_art(SUIT_ART[suitLetter], scale)
+                art_x = x - art_img.width // 2
+                art_y = y - art_img.height // 2 + 12 * scale
+                img.paste(art_img, (art_x, art_y), art_mask)
 
                 # else:
                 #   draw.rounded_rectangle([rect_x1, graphic_y, rect_x2, rect_y2],
@@ -122,7 +97,7 @@ def generate_cards():
                 # 3. Small top-left identifiers visible when card stacked
                 if value == '10':
                     # custom rendering for "10" with narrow "1"
-                    fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
+                    fontsmall = get_font("Arial", 30 * scale)
                     # draw "1" as a simple vertical rectangle
                     line_width = 2 * scale
                     line_height = 19 * scale
@@ -134,20 +109,20 @@ def generate_cards():
                     draw.text((xt + 11 * scale, yt - 2 * scale), '0', fill=colour, font=fontsmall)
 
                 elif value == 'Q':
-                    fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
+                    fontsmall = get_font("Arial", 30 * scale)
                     draw.text((xt + 4 * scale, yt - 2 * scale), value, fill=colour, font=fontsmall)
                 else:
-                    fontsmall = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", 30 * scale)
+                    fontsmall = get_font("Arial", 30 * scale)
                     draw.text((xt + 6 * scale, yt - 2 * scale), value, fill=colour, font=fontsmall)
 
                 #4. suit symbol
                 symbolFontSize = 36
                 if (suitLetter == 'h'):
-                  fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", (symbolFontSize-2) * scale)
+                  fontSymbol = get_font("Arial", (symbolFontSize-2) * scale)
                 elif (suitLetter == 'c'):
-                  fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", (symbolFontSize-2) * scale)     
+                  fontSymbol = get_font("Arial", (symbolFontSize-2) * scale)     
                 else:
-                  fontSymbol = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", symbolFontSize * scale)
+                  fontSymbol = get_font("Arial", symbolFontSize * scale)
 
                 topIndent = -7 * scale
                 rightIndent = 24 * scale
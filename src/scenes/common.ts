@@ -23,6 +23,7 @@ export const ASSET_KEYS = {
   TITLE: 'TITLE',
   CLICK_TO_START: 'CLICK_TO_START',
   CARDS: 'CARDS',
+  CARDS_MANIFEST: 'CARDS_MANIFEST',
   TABLE_BACKGROUND: 'TABLE_BACKGROUND',
   PARTICLE: 'PARTICLE',
   PLAY_MEDALLION: 'PLAY_MEDALLION',
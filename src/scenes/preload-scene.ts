@@ -1,7 +1,16 @@
 import * as Phaser from 'phaser';
-import { ASSET_KEYS, AUDIO_KEYS, CARD_HEIGHT, CARD_WIDTH, SCENE_KEYS } from './common';
+import { ASSET_KEYS, AUDIO_KEYS, SCENE_KEYS } from './common';
 import { UI_CONFIG } from './common';
 
+// written by dev/code/deck_manifest.py: one entry per atlas (faces, backs),
+// each with its content-hashed path and Phaser JSON-hash frames
+type CardsManifest = Record<string, {
+  path: string;
+  bytes: number;
+  size: { w: number; h: number };
+  frames: Record<string, object>;
+}>;
+
 export class PreloadScene extends Phaser.Scene {
   constructor() {
     super({ key: SCENE_KEYS.PRELOAD });
@@ -13,13 +22,15 @@ export class PreloadScene extends Phaser.Scene {
     this.load.image(ASSET_KEYS.CLICK_TO_START, 'assets/images/clickToStart.png');
     this.load.image(ASSET_KEYS.PLAY_MEDALLION, 'assets/images/play_medallion.png');
 
-    this.load.spritesheet(ASSET_KEYS.CARDS, 'assets/images/cards_corner-7_side-1-top-1-base-1_scale-2.png', {
-      // 56x78, from 2x blanks
-      frameWidth: CARD_WIDTH,
-      frameHeight: CARD_HEIGHT,
-      spacing: 1 * UI_CONFIG.scale,
-      margin: 1 * UI_CONFIG.scale,
-    });
+    // faces and backs are separate hashed files, so a new back design
+    // doesn't invalidate the cached faces; the manifest says what to fetch
+    this.load.json(ASSET_KEYS.CARDS_MANIFEST, 'assets/images/cards-manifest.json');
+    this.load.once(`filecomplete-json-${ASSET_KEYS.CARDS_MANIFEST}`,
+      (_key: string, _type: string, manifest: CardsManifest) => {
+        for (const [name, atlas] of Object.entries(manifest)) {
+          this.load.image(`${ASSET_KEYS.CARDS}_${name}`, atlas.path);
+        }
+      });
     
     this.load.audio(AUDIO_KEYS.DRAW_CARD, 'assets/audio/card-pick-up.ogg');
     this.load.audio(AUDIO_KEYS.FOUNDATION_ADD, 'assets/audio/card-put-down.ogg');
@@ -41,6 +52,8 @@ export class PreloadScene extends Phaser.Scene {
   }
 
   public create(): void {
+    this.#addCardsTexture();
+
     // const isTouchDevice = true; // for testing
     const isTouchDevice = this.sys.game.device.os.android ||
                         this.sys.game.device.os.iOS ||
@@ -74,4 +87,16 @@ export class PreloadScene extends Phaser.Scene {
     }
 
   }
+
+  // one CARDS texture over both atlases, frames named by sheet index
+  // (0-51 faces, 52-56 backs) so game code keeps using frame numbers
+  #addCardsTexture(): void {
+    const manifest = this.cache.json.get(ASSET_KEYS.CARDS_MANIFEST) as CardsManifest;
+    const names = Object.keys(manifest);
+    const sources = names.map((name) =>
+      this.textures.get(`${ASSET_KEYS.CARDS}_${name}`).getSourceImage() as HTMLImageElement);
+    this.textures.addAtlasJSONHash(ASSET_KEYS.CARDS, sources,
+      names.map((name) => ({ frames: manifest[name].frames })));
+    names.forEach((name) => this.textures.remove(`${ASSET_KEYS.CARDS}_${name}`));
+  }
 }